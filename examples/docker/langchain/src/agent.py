@@ -1,28 +1,50 @@
 from langchain.agents import AgentType, initialize_agent
 from langchain.chat_models import ChatOpenAI
+from langchain.prompts import MessagesPlaceholder
 from langchain.schema import BaseMessage as BaseLangchainMessage
 from langchain.schema import HumanMessage, SystemMessage
 from roster_sdk.adapters import get_roster_langchain_tools
-from roster_sdk.adapters.langchain import RosterLoggingHandler
+from roster_sdk.adapters.langchain import RosterAgentCache, RosterLoggingHandler
 from roster_sdk.adapters.prompts import get_roster_preamble
 from roster_sdk.agent.interface import BaseRosterAgent
 from roster_sdk.models.chat import ChatMessage
 from roster_sdk.models.resources.task import TaskAssignment
 
+agent_cache = RosterAgentCache()
+
 
 def build_agent(
+    identity: str,
     team: str,
     role: str,
     temperature: float = 0,
     model: str = "gpt-4",
-    **agent_kwargs,
 ):
+    system_message = SystemMessage(
+        content=get_roster_preamble(agent_name=identity, team_name=team, role_name=role)
+    )
     return initialize_agent(
         get_roster_langchain_tools(team=team, role=role),
         ChatOpenAI(temperature=temperature, model_name=model),
         agent=AgentType.OPENAI_FUNCTIONS,
         verbose=True,
-        agent_kwargs=agent_kwargs,
+        agent_kwargs={
+            "system_message": system_message,
+            # Filled in per call, so that the cached agent holds no history
+            "extra_prompt_messages": [
+                MessagesPlaceholder(variable_name="chat_history")
+            ],
+        },
+    )
+
+
+def get_agent(identity: str, team: str, role: str, **config):
+    return agent_cache.get(
+        team,
+        role,
+        lambda: build_agent(identity, team, role, **config),
+        identity=identity,
+        **config,
     )
 
 
@@ -42,12 +64,6 @@ class LangchainAgent(BaseRosterAgent):
     async def chat(
         self, identity: str, team: str, role: str, chat_history: list[ChatMessage]
     ) -> str:
-        system_message = SystemMessage(
-            content=get_roster_preamble(
-                agent_name=identity, team_name=team, role_name=role
-            )
-        )
-
         memory = []
         for message in chat_history[:-1]:
             if message.sender == identity:
@@ -55,13 +71,9 @@ class LangchainAgent(BaseRosterAgent):
             else:
                 memory.append(HumanMessage(content=message.message))
 
-        return await build_agent(
-            team=team,
-            role=role,
-            system_message=system_message,
-            extra_prompt_messages=memory,
-        ).arun(
-            chat_history[-1].message,
+        return await get_agent(identity, team, role).arun(
+            input=chat_history[-1].message,
+            chat_history=memory,
             callbacks=[RosterLoggingHandler()],
         )
 
@@ -70,21 +82,15 @@ class LangchainAgent(BaseRosterAgent):
     ) -> str:
         # NOTE: Agent does not know the name of the Task
         # (caused confusion in GPT-3.5 testing, and is pretty much metadata anyway)
-        system_message = SystemMessage(
-            content=get_roster_preamble(
-                agent_name=assignment.identity_name,
-                role_name=assignment.role_name,
-                team_name=assignment.team_name,
-            )
-        )
-
         task_message = f"Please complete the following task:\n{description}"
 
-        return await build_agent(
-            team=assignment.team_name,
-            role=assignment.role_name,
-            system_message=system_message,
-        ).arun(task_message, callbacks=[RosterLoggingHandler()])
+        return await get_agent(
+            assignment.identity_name, assignment.team_name, assignment.role_name
+        ).arun(
+            input=task_message,
+            chat_history=[],
+            callbacks=[RosterLoggingHandler()],
+        )
 
 
 agent = LangchainAgent()
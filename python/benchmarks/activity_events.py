@@ -0,0 +1,84 @@
+"""Microbenchmark for creating and serializing the ActivityEvents of a task.
+
+Compares the pydantic models with the slotted records used on the hot path.
+
+Usage (from the python/ directory): python -m benchmarks.activity_events
+"""
+
+import timeit
+import tracemalloc
+
+from roster_sdk.models.api.activity import (
+    ActivityEvent,
+    ActivityRecord,
+    ActivityType,
+    AgentContext,
+    AgentContextRecord,
+    ExecutionContext,
+    ExecutionContextRecord,
+    ExecutionType,
+)
+
+CONTENT = "Tool Output: " + "lorem ipsum dolor sit amet " * 20
+# Events sent per execution by a chatty agent
+EVENTS = 20
+NUMBER = 2000
+
+
+def models(serialize=True):
+    # What set_agent_activity_context and ActivityLogger used to build
+    execution = ExecutionContext(
+        execution_id="execution-1", execution_type=ExecutionType.TASK
+    )
+    agent = AgentContext(identity="Alice", team="Red Team", role="Engineer")
+    events = [
+        ActivityEvent(
+            execution_id=execution.execution_id,
+            execution_type=execution.execution_type,
+            type=ActivityType.THOUGHT,
+            content=CONTENT,
+            agent_context=agent,
+        )
+        for _ in range(EVENTS)
+    ]
+    return [event.serialize() for event in events] if serialize else events
+
+
+def records(serialize=True):
+    execution = ExecutionContextRecord("execution-1", ExecutionType.TASK)
+    agent = AgentContextRecord("Alice", "Red Team", "Engineer")
+    events = [
+        ActivityRecord(
+            execution.execution_id,
+            execution.execution_type,
+            ActivityType.THOUGHT,
+            CONTENT,
+            agent,
+        )
+        for _ in range(EVENTS)
+    ]
+    return [event.serialize() for event in events] if serialize else events
+
+
+def event_size(func) -> float:
+    """Bytes held per event (and its contexts), excluding the content"""
+    tracemalloc.start()
+    try:
+        events = func(serialize=False)
+        return tracemalloc.get_traced_memory()[0] / len(events)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    assert models() == records()
+    for name, func in [("models", models), ("records", records)]:
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(
+            f"{name:>7}: {NUMBER * EVENTS / seconds:>10,.0f} events/s, "
+            f"{event_size(func):>6.0f} bytes/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Microbenchmark for serializing and SSE-framing ActivityEvents.
+
+Usage (from the python/ directory): python -m benchmarks.activity_serialization
+"""
+
+import json
+import timeit
+
+from roster_sdk.models.api.activity import (
+    ActivityEvent,
+    ActivityType,
+    AgentContext,
+    ExecutionType,
+)
+from roster_sdk.serialization import orjson, sse_frame
+
+EVENT = ActivityEvent(
+    execution_id="execution-1",
+    execution_type=ExecutionType.TASK,
+    type=ActivityType.ACTION,
+    content="Tool Output: " + "lorem ipsum dolor sit amet " * 20,
+    agent_context=AgentContext(identity="Alice", team="Red Team", role="Engineer"),
+)
+NUMBER = 20000
+
+
+def previous():
+    # What ActivityEvent.serialize and the /activity-stream route used to do
+    return json.dumps(EVENT.json()).encode("utf-8") + b"\n\n"
+
+
+def current():
+    return sse_frame(EVENT.serialize(), event_id=1)
+
+
+def main():
+    print(f"JSON backend: {'orjson' if orjson is not None else 'json'}")
+    for name, func in [("previous", previous), ("current", current)]:
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(
+            f"{name:>8}: {NUMBER / seconds:>10,.0f} events/s, "
+            f"{len(func()):>4} bytes/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Microbenchmark for deserializing Roster API listings, validated vs trusted.
+
+Usage (from the python/ directory): python -m benchmarks.trusted_deserialization
+"""
+
+import json
+import timeit
+
+from roster_sdk.models.resources.task import (
+    TaskAssignment,
+    TaskResource,
+    TaskSpec,
+    TaskStatus,
+)
+from roster_sdk.models.resources.team import (
+    Layout,
+    Member,
+    Role,
+    TeamResource,
+    TeamSpec,
+)
+from roster_sdk.models.trusted import construct_trusted
+
+
+def task(i: int, depth: int = 3) -> dict:
+    spec = None
+    for level in range(depth):
+        spec = TaskSpec(
+            name=f"task-{i}-{level}",
+            description="Implement the thing. " * 10,
+            assignment_affinities=["software engineer", "backend"],
+            assignment_anti_affinities=["frontend"],
+            parent=spec,
+        )
+    return TaskResource(
+        spec=spec,
+        status=TaskStatus(
+            name=spec.name,
+            status="running",
+            assignment=TaskAssignment(
+                team_name="Red Team",
+                role_name="Engineer",
+                identity_name="Alice",
+                agent_name="agent-1",
+            ),
+        ),
+    ).dict()
+
+
+def team(i: int, size: int = 10) -> dict:
+    roles = [
+        Role(name=f"role-{j}", description="Does things. " * 5) for j in range(size)
+    ]
+    return TeamResource.initial_state(
+        TeamSpec(
+            name=f"team-{i}",
+            type="red",
+            layout=Layout(roles=roles),
+            members={
+                role.name: Member(identity=f"member-{j}", agent="agent-1")
+                for j, role in enumerate(roles)
+            },
+        )
+    ).dict()
+
+
+# As they'd arrive from the API
+LISTINGS = [
+    ("tasks", TaskResource, json.loads(json.dumps([task(i) for i in range(500)]))),
+    ("teams", TeamResource, json.loads(json.dumps([team(i) for i in range(100)]))),
+]
+NUMBER = 5
+
+
+def validated(resource_type, items):
+    return [resource_type(**data) for data in items]
+
+
+def trusted(resource_type, items):
+    return [construct_trusted(resource_type, data) for data in items]
+
+
+def main():
+    for listing, resource_type, items in LISTINGS:
+        assert validated(resource_type, items) == trusted(resource_type, items)
+        for name, func in [("validated", validated), ("trusted", trusted)]:
+            seconds = min(
+                timeit.repeat(
+                    lambda: func(resource_type, items), number=NUMBER, repeat=5
+                )
+            )
+            print(
+                f"{listing:>5} {name:>9}: "
+                f"{NUMBER * len(items) / seconds:>10,.0f} resources/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
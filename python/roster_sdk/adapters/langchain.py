@@ -1,3 +1,18 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Optional,
+    TypeVar,
+)
+
+from pydantic import BaseModel, Field
+from roster_sdk import config
 from roster_sdk.agent.logs import get_logger, get_roster_activity_logger
 from roster_sdk.client.agent import CollaborationInterface
 
@@ -18,11 +33,67 @@ ask_team_member_description = """
 Ask a question to a teammate using the name of their role.
 """
 
+ask_team_members_description = """
+Ask the same question to several teammates at once, using the names of their roles.
+Optionally, give up on teammates that haven't answered within timeout seconds.
+"""
+
 ask_manager_description = """
 Ask a question to your manager.
 """
 
 
+class AskTeamMembersArgs(BaseModel):
+    # Spelled out, since the schema inferred from the signature
+    # loses the list type of member_roles
+    member_roles: list[str] = Field(description="The roles of the teammates to ask.")
+    question: str = Field(description="The question to ask.")
+    timeout: Optional[float] = Field(
+        default=None, description="Seconds to wait for answers."
+    )
+
+
+T = TypeVar("T")
+
+
+class RosterAgentCache(Generic[T]):
+    """Bounded LRU of objects built per (team, role, config), e.g. agent executors.
+
+    Cached objects are shared by concurrent requests, so they mustn't hold
+    per-request state: memory (chat history) and callbacks should be passed
+    to each invocation instead, e.g.
+
+        executor = agent_cache.get(team, role, build, model="gpt-4")
+        await executor.arun(input=..., chat_history=..., callbacks=[...])
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, team: str, role: str, build: Callable[[], T], **agent_config) -> T:
+        """The object cached for (team, role, agent_config), built if missing"""
+        key = (team, role, tuple(sorted(agent_config.items())))
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+
 def async_structured_tool(
     func,
     description: str,
@@ -48,12 +119,33 @@ def roster_collaboration_tools(team: str, role: str) -> list[StructuredTool]:
             collab_interface.ask_team_member,
             description=ask_team_member_description,
         ),
+        async_structured_tool(
+            collab_interface.ask_team_members,
+            description=ask_team_members_description,
+            args_schema=AskTeamMembersArgs,
+        ),
+        async_structured_tool(
+            collab_interface.ask_manager,
+            description=ask_manager_description,
+        ),
     ]
 
 
+tools_cache: RosterAgentCache[list[StructuredTool]] = RosterAgentCache(
+    max_size=config.ROSTER_LANGCHAIN_CACHE_SIZE
+)
+
+
 def get_roster_langchain_tools(team: str, role: str) -> list[StructuredTool]:
-    # Extend with additional interfaces
-    return roster_collaboration_tools(team=team, role=role)
+    # Tools are stateless, so they are built once per team and role
+    tools = tools_cache.get(
+        team,
+        role,
+        # Extend with additional interfaces
+        lambda: roster_collaboration_tools(team=team, role=role),
+    )
+    # A copy, so that callers can add their own tools
+    return list(tools)
 
 
 # It seems that langchain assumes the callback handler
@@ -69,7 +161,9 @@ class RosterLoggingHandler(AsyncCallbackHandler):
         **kwargs,
     ) -> None:
         logger = get_logger()
-        logger.debug(f"[LLM START] Prompts: {prompts}")
+        # Prompts can be huge, so don't format them unless they'll be logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[LLM START] Prompts: %s", prompts)
 
     async def on_llm_end(
         self,
@@ -80,7 +174,8 @@ class RosterLoggingHandler(AsyncCallbackHandler):
         **kwargs,
     ) -> None:
         logger = get_logger()
-        logger.debug(f"[LLM END] Response: {response}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[LLM END] Response: %s", response)
 
     async def on_agent_action(
         self,
@@ -115,3 +210,54 @@ class RosterLoggingHandler(AsyncCallbackHandler):
     ):
         logger = get_roster_activity_logger()
         logger.action(finish.log)
+
+
+class RosterTokenStreamHandler(AsyncCallbackHandler):
+    """Forwards LLM tokens (from LLMs created with streaming=True)
+    to a RosterAgentInterface.chat_stream, e.g.:
+
+        handler = RosterTokenStreamHandler()
+        run = agent.arun(prompt, callbacks=[handler])
+        async for token in handler.stream(run):
+            yield token
+    """
+
+    def __init__(self):
+        self.tokens: asyncio.Queue[str] = asyncio.Queue()
+
+    async def on_llm_new_token(
+        self,
+        token: str,
+        *,
+        run_id,
+        parent_run_id=None,
+        **kwargs,
+    ) -> None:
+        self.tokens.put_nowait(token)
+
+    async def stream(self, run: Awaitable[str]) -> AsyncIterator[str]:
+        """Yield tokens as they arrive while run is awaited.
+
+        If the LLM didn't stream any tokens, run's result is yielded instead.
+        """
+        task = asyncio.ensure_future(run)
+        streamed = False
+        try:
+            while True:
+                next_token = asyncio.ensure_future(self.tokens.get())
+                await asyncio.wait(
+                    [next_token, task], return_when=asyncio.FIRST_COMPLETED
+                )
+                if not next_token.done():
+                    next_token.cancel()
+                    break
+                streamed = True
+                yield next_token.result()
+            while not self.tokens.empty():
+                streamed = True
+                yield self.tokens.get_nowait()
+            result = task.result()
+            if not streamed:
+                yield result
+        finally:
+            task.cancel()
@@ -0,0 +1,300 @@
+import asyncio
+import bisect
+import json
+import os
+import threading
+from typing import AsyncIterator, BinaryIO, Iterator, Optional
+
+from roster_sdk.serialization import dumps
+
+from .logs import logger
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+# Events read at a time when replaying
+REPLAY_BATCH_SIZE = 1000
+
+# (event id, serialized event)
+LoggedEvent = tuple[int, bytes]
+
+# (segment path, line to append, or None to remove the segment)
+_Write = tuple[str, Optional[bytes]]
+
+
+class _Segment:
+    __slots__ = ("base_id", "path", "size")
+
+    def __init__(self, base_id: int, path: str, size: int = 0):
+        self.base_id = base_id
+        self.path = path
+        self.size = size
+
+
+class ActivityLog:
+    """Append-only, segmented log of serialized activity events.
+
+    Each line is "<event id>\\t<execution id (JSON)>\\t<event (JSON)>".
+    Event ids increase across segments (and restarts), and double as SSE event ids.
+    An in-memory index maps each execution to the positions of its events,
+    and is rebuilt from the segments on startup.
+    The oldest segments are deleted once the log grows beyond max_total_bytes.
+
+    Appends are indexed straight away, but written in batches off the event loop
+    (on its default executor, like the async reads), or straight away without one.
+    Reads write out pending appends first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        max_total_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_total_bytes = max_total_bytes
+        self.last_event_id = 0
+        self.segments: list[_Segment] = []
+        # execution id -> [(event id, segment base id, position in segment)]
+        self.index: dict[str, list[tuple[int, int, int]]] = {}
+        # Only used by _write, under _write_lock
+        self._file: Optional[BinaryIO] = None
+        self._file_path: Optional[str] = None
+        self._write_lock = threading.Lock()
+        self._pending: list[_Write] = []
+        self._pending_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(segment.size for segment in self.segments)
+
+    def _segment_path(self, base_id: int) -> str:
+        return os.path.join(
+            self.directory, f"{SEGMENT_PREFIX}{base_id:020d}{SEGMENT_SUFFIX}"
+        )
+
+    def _load(self):
+        names = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        for name in names:
+            base_id = int(name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+            segment = _Segment(base_id, os.path.join(self.directory, name))
+            with open(segment.path, "r+b") as f:
+                position = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Partially written before a crash
+                        break
+                    try:
+                        event_id, execution_id, _ = line.split(b"\t", 2)
+                        self._index(
+                            json.loads(execution_id), int(event_id), base_id, position
+                        )
+                    except ValueError:
+                        logger.warning(
+                            "(activity log) Skipping malformed line at %s:%d",
+                            segment.path,
+                            position,
+                        )
+                    position += len(line)
+                f.truncate(position)
+            segment.size = position
+            self.segments.append(segment)
+
+    def _index(self, execution_id: str, event_id: int, base_id: int, position: int):
+        self.index.setdefault(execution_id, []).append((event_id, base_id, position))
+        self.last_event_id = max(self.last_event_id, event_id)
+
+    def _current_segment(self) -> _Segment:
+        if not self.segments or self.segments[-1].size >= self.max_segment_bytes:
+            base_id = self.last_event_id + 1
+            self.segments.append(_Segment(base_id, self._segment_path(base_id)))
+            self._enforce_retention()
+        return self.segments[-1]
+
+    def _enforce_retention(self):
+        removed = set()
+        while len(self.segments) > 1 and self.total_bytes > self.max_total_bytes:
+            segment = self.segments.pop(0)
+            removed.add(segment.base_id)
+            # After any appends still pending for it
+            self._pending_write(segment.path, None)
+        if not removed:
+            return
+        for execution_id in list(self.index):
+            entries = [e for e in self.index[execution_id] if e[1] not in removed]
+            if entries:
+                self.index[execution_id] = entries
+            else:
+                del self.index[execution_id]
+
+    def append(self, execution_id: str, payload: bytes) -> int:
+        """Append a serialized event, returning its event id"""
+        segment = self._current_segment()
+        event_id = self.last_event_id + 1
+        line = b"%d\t%s\t%s\n" % (event_id, dumps(execution_id), payload)
+        self._index(execution_id, event_id, segment.base_id, segment.size)
+        segment.size += len(line)
+        self._pending_write(segment.path, line)
+        return event_id
+
+    def _pending_write(self, path: str, line: Optional[bytes]):
+        with self._pending_lock:
+            self._pending.append((path, line))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flush_task is None:
+            # Everything appended until it runs goes out in one batch
+            self._flush_task = loop.create_task(self._flush_pending())
+
+    async def _flush_pending(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                await loop.run_in_executor(None, self.flush)
+        except Exception:
+            logger.exception("(activity log) Failed to write events")
+        finally:
+            self._flush_task = None
+
+    def flush(self):
+        """Write out pending appends"""
+        with self._write_lock:
+            with self._pending_lock:
+                writes, self._pending = self._pending, []
+            self._write(writes)
+
+    def _write(self, writes: list[_Write]):
+        for path, line in writes:
+            if line is None:
+                if path == self._file_path:
+                    self._close_file()
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if path != self._file_path:
+                self._close_file()
+                self._file, self._file_path = open(path, "ab"), path
+            self._file.write(line)
+        if self._file is not None:
+            # Flushed (but not fsynced) so that replays can read it straight away
+            self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file, self._file_path = None, None
+
+    def _segment_paths(self) -> dict[int, str]:
+        return {segment.base_id: segment.path for segment in self.segments}
+
+    def read_execution(self, execution_id: str, since: int = 0) -> list[LoggedEvent]:
+        """Events for one execution with an id greater than since, in order"""
+        self.flush()
+        entries = self.index.get(execution_id, [])
+        entries = entries[bisect.bisect_right(entries, (since, float("inf"))) :]
+        paths = self._segment_paths()
+        events = []
+        f, current_base = None, None
+        try:
+            for event_id, base_id, position in entries:
+                if base_id != current_base:
+                    if f is not None:
+                        f.close()
+                    f, current_base = open(paths[base_id], "rb"), base_id
+                f.seek(position)
+                events.append((event_id, f.readline().rstrip(b"\n").split(b"\t", 2)[2]))
+        except (FileNotFoundError, KeyError):
+            # Removed by retention while reading
+            pass
+        finally:
+            if f is not None:
+                f.close()
+        return events
+
+    def read_since(self, since: int) -> list[LoggedEvent]:
+        """All events with an id greater than since, in order"""
+        return [event for batch in self.iter_since(since) for event in batch]
+
+    def iter_since(
+        self, since: int, batch_size: int = REPLAY_BATCH_SIZE
+    ) -> Iterator[list[LoggedEvent]]:
+        """Events with an id greater than since, in order and in batches of (at
+        most) batch_size, so that only one batch is held in memory at a time
+        """
+        self.flush()
+        batch = []
+        segments = list(self.segments)
+        for i, segment in enumerate(segments):
+            # Skip segments that only hold events up to since
+            if i + 1 < len(segments) and segments[i + 1].base_id <= since + 1:
+                continue
+            try:
+                with open(segment.path, "rb") as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            # Still being written
+                            break
+                        try:
+                            event_id, _, payload = line.rstrip(b"\n").split(b"\t", 2)
+                            event_id = int(event_id)
+                        except ValueError:
+                            # Malformed (and not indexed on startup either)
+                            continue
+                        if event_id > since:
+                            batch.append((event_id, payload))
+                            if len(batch) >= batch_size:
+                                yield batch
+                                batch = []
+            except FileNotFoundError:
+                continue
+        if batch:
+            yield batch
+
+    async def aread_execution(
+        self, execution_id: str, since: int = 0
+    ) -> list[LoggedEvent]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.read_execution, execution_id, since
+        )
+
+    async def aread_since(self, since: int) -> list[LoggedEvent]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.read_since, since
+        )
+
+    async def aiter_since(
+        self, since: int, batch_size: int = REPLAY_BATCH_SIZE
+    ) -> AsyncIterator[list[LoggedEvent]]:
+        """iter_since, with each batch read on the default executor"""
+        loop = asyncio.get_running_loop()
+        batches = self.iter_since(since, batch_size)
+        try:
+            while True:
+                batch = await loop.run_in_executor(None, next, batches, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            try:
+                batches.close()
+            except ValueError:
+                # Cancelled while a batch is still being read on the executor
+                # (the segment is then closed once the generator is collected)
+                pass
+
+    def close(self):
+        self.flush()
+        with self._write_lock:
+            self._close_file()
@@ -0,0 +1,124 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Optional
+
+from roster_sdk.models.api.activity import ActivityRecord
+from roster_sdk.serialization import sse_frame
+
+from .activity_log import ActivityLog
+
+
+class SlowConsumerPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"
+    DISCONNECT = "disconnect"
+
+
+class Subscription:
+    """A single subscriber's bounded buffer of (event id, SSE frame) items"""
+
+    def __init__(self, max_size: int, policy: SlowConsumerPolicy):
+        self.max_size = max_size
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._buffer: deque[tuple[int, bytes]] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def push(self, item: tuple[int, bytes]):
+        if self.closed:
+            return
+        if len(self._buffer) >= self.max_size:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                self.close()
+                return
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append(item)
+        self._ready.set()
+
+    async def get(
+        self, timeout: Optional[float] = None
+    ) -> Optional[list[tuple[int, bytes]]]:
+        """Wait for and take everything buffered.
+
+        Returns an empty list if nothing arrived within the timeout,
+        and None once the subscription has been closed.
+        """
+        if self.closed:
+            return None
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        if self.closed:
+            return None
+        items = list(self._buffer)
+        self._buffer.clear()
+        self._ready.clear()
+        return items
+
+    def close(self):
+        self.closed = True
+        self._buffer.clear()
+        # Wake up the consumer so it notices
+        self._ready.set()
+
+
+class ActivityBroker:
+    """Fans activity events out to every subscriber.
+
+    Each event is serialized once, no matter how many subscribers there are,
+    and each subscriber has its own bounded buffer so that a slow consumer
+    can't hold up (or take events from) the others.
+    When there is an activity log, every event is appended to it,
+    and its ids are used as the SSE event ids so that clients can resume.
+    """
+
+    def __init__(
+        self,
+        max_buffer_size: int = 1000,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        activity_log: Optional[ActivityLog] = None,
+    ):
+        self.max_buffer_size = max_buffer_size
+        self.policy = policy
+        self.activity_log = activity_log
+        self.subscriptions: set[Subscription] = set()
+        # SSE event ids, so clients can tell whether they missed anything
+        self.last_event_id = activity_log.last_event_id if activity_log else 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_buffer_size, self.policy)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        self.subscriptions.discard(subscription)
+
+    def publish(self, event: ActivityRecord):
+        """ActivityLogger listener"""
+        if self.activity_log is not None:
+            payload = event.serialize()
+            self.last_event_id = self.activity_log.append(event.execution_id, payload)
+        else:
+            self.last_event_id += 1
+            if not self.subscriptions:
+                return
+            payload = event.serialize()
+        if not self.subscriptions:
+            return
+        item = (self.last_event_id, sse_frame(payload, event_id=self.last_event_id))
+        for subscription in list(self.subscriptions):
+            subscription.push(item)
+            if subscription.closed:
+                self.subscriptions.discard(subscription)
+
+    def close(self):
+        """Disconnect every subscriber"""
+        for subscription in list(self.subscriptions):
+            self.unsubscribe(subscription)
@@ -1,17 +1,27 @@
+import math
+import time
 from contextvars import ContextVar
 from typing import Optional
 
-from roster_sdk.models.api.activity import AgentContext, ExecutionContext, ExecutionType
+from roster_sdk.models.api.activity import (
+    AgentContextRecord,
+    ExecutionContextRecord,
+    ExecutionType,
+)
 
-agent_execution_context: ContextVar[Optional[ExecutionContext]] = ContextVar(
+agent_execution_context: ContextVar[Optional[ExecutionContextRecord]] = ContextVar(
     "agent_execution_context", default=None
 )
-agent_context: ContextVar[Optional[AgentContext]] = ContextVar(
+agent_context: ContextVar[Optional[AgentContextRecord]] = ContextVar(
     "agent_context", default=None
 )
+# time.monotonic() by which the current execution should be done
+agent_deadline: ContextVar[Optional[float]] = ContextVar("agent_deadline", default=None)
 
 
-def get_agent_activity_context() -> Optional[tuple[AgentContext, ExecutionContext]]:
+def get_agent_activity_context() -> (
+    Optional[tuple[AgentContextRecord, ExecutionContextRecord]]
+):
     agent_ctx = agent_context.get()
     execution_ctx = agent_execution_context.get()
     if agent_ctx is None or execution_ctx is None:
@@ -26,16 +36,23 @@ def set_agent_activity_context(
     team: str = "",
     role: str = "",
 ):
-    agent_execution_context.set(
-        ExecutionContext(
-            execution_id=execution_id,
-            execution_type=execution_type,
-        )
-    )
-    agent_context.set(
-        AgentContext(
-            identity=identity,
-            team=team,
-            role=role,
-        )
-    )
+    agent_execution_context.set(ExecutionContextRecord(execution_id, execution_type))
+    agent_context.set(AgentContextRecord(identity, team, role))
+
+
+def set_agent_deadline(timeout: Optional[float]):
+    """Set a deadline timeout seconds from now, unless there's an earlier one"""
+    if timeout is None or not math.isfinite(timeout) or timeout <= 0:
+        return
+    deadline = time.monotonic() + timeout
+    current = agent_deadline.get()
+    if current is None or deadline < current:
+        agent_deadline.set(deadline)
+
+
+def get_remaining_time() -> Optional[float]:
+    """Seconds left until the deadline (None if there isn't one)"""
+    deadline = agent_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
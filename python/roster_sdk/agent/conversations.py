@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from roster_sdk.models.chat import ChatMessage
+
+
+class _Conversation:
+    __slots__ = ("messages", "last_used")
+
+    def __init__(self, messages: list[ChatMessage], last_used: float):
+        self.messages = messages
+        self.last_used = last_used
+
+
+class ConversationStore:
+    """Bounded LRU of conversation histories, keyed by conversation id.
+
+    Lets callers send only the messages the agent hasn't seen yet.
+    Conversations idle for longer than idle_timeout are dropped,
+    after which callers have to send the full history again.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        idle_timeout: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._conversations: OrderedDict[str, _Conversation] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def _evict_idle(self, now: float):
+        # Least recently used first, so stop at the first one still in use
+        while self._conversations:
+            conversation_id, conversation = next(iter(self._conversations.items()))
+            if now - conversation.last_used <= self.idle_timeout:
+                break
+            del self._conversations[conversation_id]
+
+    def update(
+        self, conversation_id: str, sequence: int, messages: list[ChatMessage]
+    ) -> Optional[list[ChatMessage]]:
+        """Add messages starting at position sequence, returning the full history.
+
+        Returns None if the history before sequence isn't known (anymore),
+        unless sequence is 0, in which case messages is the full history.
+        """
+        now = self.clock()
+        self._evict_idle(now)
+        conversation = self._conversations.get(conversation_id)
+        if sequence == 0:
+            conversation = _Conversation(list(messages), now)
+            self._conversations[conversation_id] = conversation
+        elif conversation is None or len(conversation.messages) != sequence:
+            return None
+        else:
+            conversation.messages.extend(messages)
+            conversation.last_used = now
+        self._conversations.move_to_end(conversation_id)
+        while len(self._conversations) > self.max_size:
+            self._conversations.popitem(last=False)
+        return conversation.messages
+
+    def append(self, conversation_id: str, message: ChatMessage) -> Optional[int]:
+        """Add a message (e.g. the agent's response), returning the new length"""
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            return None
+        conversation.messages.append(message)
+        return len(conversation.messages)
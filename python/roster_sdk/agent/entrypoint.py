@@ -1,44 +1,161 @@
 import asyncio
+import inspect
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from roster_sdk.config import AgentConfig
-from roster_sdk.models.api.activity import ActivityEvent, ExecutionType
+from roster_sdk.models.api.activity import ExecutionType
 from roster_sdk.models.api.chat import ChatArgs, ChatResponse
 from roster_sdk.models.api.task import ExecuteTaskArgs
+from roster_sdk.models.chat import ChatMessage
+from roster_sdk.serialization import dumps, sse_frame
 
-from ..constants import EXECUTION_ID_HEADER, EXECUTION_TYPE_HEADER
+from ..constants import (
+    CONVERSATION_LENGTH_HEADER,
+    EXECUTION_ID_HEADER,
+    EXECUTION_TYPE_HEADER,
+    TIMEOUT_HEADER,
+)
 from . import errors
-from .context import set_agent_activity_context
+from .activity_log import ActivityLog
+from .broker import ActivityBroker, SlowConsumerPolicy
+from .conversations import ConversationStore
+from .context import (
+    agent_deadline,
+    get_remaining_time,
+    set_agent_activity_context,
+    set_agent_deadline,
+)
 from .interface import RosterAgentInterface
 from .logs import get_logger, get_roster_activity_logger
 
 logger = get_logger()
 
 
+def set_deadline(request: Request, default_timeout: float):
+    """Apply the caller's deadline (if any), or the default one if it's earlier"""
+    try:
+        # Non-finite timeouts ("nan", "inf") are ignored by set_agent_deadline
+        set_agent_deadline(float(request.headers.get(TIMEOUT_HEADER, "")))
+    except ValueError:
+        pass
+    set_agent_deadline(default_timeout)
+
+
+def _takes_keyword(func, name: str) -> bool:
+    """Whether func can be called with the keyword argument name"""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        parameter.kind == parameter.VAR_KEYWORD
+        or (
+            parameter.name == name
+            and parameter.kind
+            in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+        )
+        for parameter in parameters
+    )
+
+
+class DrainingServer(uvicorn.Server):
+    """Tells the entrypoint to start draining as soon as a shutdown is requested,
+    before uvicorn waits for open connections (e.g. activity streams) to close.
+    """
+
+    def __init__(self, config: uvicorn.Config, entrypoint: "Entrypoint"):
+        super().__init__(config)
+        self.entrypoint = entrypoint
+
+    def handle_exit(self, sig, frame):
+        self.entrypoint.begin_drain_threadsafe()
+        super().handle_exit(sig, frame)
+
+
 class Entrypoint:
     def __init__(self, agent: RosterAgentInterface, config: AgentConfig):
         self.agent = agent
         self.config = config
-        self.app = FastAPI(title="Roster Agent", version="0.1.0")
+        self.app = FastAPI(
+            title="Roster Agent", version="0.1.0", lifespan=self.lifespan
+        )
+        self.activity_log = (
+            ActivityLog(
+                config.activity_log_dir,
+                max_segment_bytes=config.activity_log_segment_bytes,
+                max_total_bytes=config.activity_log_max_bytes,
+            )
+            if config.activity_log_dir
+            else None
+        )
+        self.activity_broker = ActivityBroker(
+            max_buffer_size=config.activity_stream_buffer_size,
+            policy=SlowConsumerPolicy(config.activity_stream_slow_consumer_policy),
+            activity_log=self.activity_log,
+        )
+        self.conversations = ConversationStore(
+            max_size=config.conversation_cache_size,
+            idle_timeout=config.conversation_idle_timeout,
+        )
+        # Agents written before tasks had priorities implement
+        # ack_task(name, description, assignment)
+        self.ack_task_takes_priority = _takes_keyword(
+            getattr(agent, "ack_task", None), "priority"
+        )
+        self.draining = False
+        # time.monotonic() by which shutdown should be done, set once draining
+        self.drain_deadline: Optional[float] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.setup_routes()
-        self.activity_stream = asyncio.Queue()
 
     @classmethod
     def from_env(cls, agent: RosterAgentInterface):
         config = AgentConfig.from_env()
         return cls(agent=agent, config=config)
 
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        activity_logger = get_roster_activity_logger()
+        activity_logger.add_listener(self.activity_broker.publish)
+        self.loop = asyncio.get_running_loop()
+        await self.agent.startup()
+        yield
+        self.begin_drain()
+        # Whatever uvicorn's graceful shutdown left of the drain timeout
+        agent_deadline.set(self.drain_deadline)
+        # Drains tasks, flushes status updates and closes the client
+        await self.agent.shutdown()
+        activity_logger.remove_listener(self.activity_broker.publish)
+        if self.activity_log is not None:
+            self.activity_log.close()
+
+    def begin_drain(self):
+        """Reject new tasks, and end activity streams so connections can close"""
+        if self.draining:
+            return
+        logger.info("Draining agent")
+        self.draining = True
+        self.drain_deadline = time.monotonic() + self.config.shutdown_drain_timeout
+        self.activity_broker.close()
+
+    def begin_drain_threadsafe(self):
+        # Called from signal handlers
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.begin_drain)
+
     def setup_routes(self):
         @self.app.get("/healthcheck")
         async def healthcheck() -> bool:
             """Healthcheck"""
             return True
 
-        @self.app.post("/chat")
-        async def chat(request: Request, args: ChatArgs) -> ChatResponse:
-            """Respond to a prompt"""
+        def set_chat_context(request: Request, args: ChatArgs):
             execution_id = request.headers.get(EXECUTION_ID_HEADER)
             execution_type = request.headers.get(EXECUTION_TYPE_HEADER)
             if execution_id:
@@ -57,17 +174,103 @@ class Entrypoint:
                     team=args.team,
                     role=args.role,
                 )
-            response = await self.agent.chat(
-                identity=args.identity,
-                team=args.team,
-                role=args.role,
-                chat_history=args.messages,
+            set_deadline(request, self.config.chat_timeout)
+
+        def chat_history(args: ChatArgs) -> list[ChatMessage]:
+            if args.conversation_id is None:
+                return args.messages
+            history = self.conversations.update(
+                args.conversation_id, args.sequence, args.messages
+            )
+            if history is None:
+                # Forgotten (or out of step), so the caller has to start over
+                raise HTTPException(
+                    status_code=409,
+                    detail="Unknown conversation state, send the full history",
+                    headers={CONVERSATION_LENGTH_HEADER: "0"},
+                )
+            # A copy, so the agent can't change what's remembered
+            return list(history)
+
+        def remember_response(args: ChatArgs, response: str) -> Optional[int]:
+            if args.conversation_id is None:
+                return None
+            return self.conversations.append(
+                args.conversation_id,
+                ChatMessage(sender=args.identity, message=response),
+            )
+
+        @self.app.post("/chat")
+        async def chat(request: Request, args: ChatArgs) -> ChatResponse:
+            """Respond to a prompt"""
+            set_chat_context(request, args)
+            history = chat_history(args)
+            try:
+                # Abandon the chat (and its LLM calls) once the caller has given up
+                response = await asyncio.wait_for(
+                    self.agent.chat(
+                        identity=args.identity,
+                        team=args.team,
+                        role=args.role,
+                        chat_history=history,
+                    ),
+                    timeout=get_remaining_time(),
+                )
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=504, detail="Deadline exceeded")
+            return ChatResponse(
+                message=response,
+                conversation_length=remember_response(args, response),
             )
-            return ChatResponse(message=response)
+
+        @self.app.post("/chat/stream")
+        async def chat_stream(request: Request, args: ChatArgs):
+            """Respond to a prompt, streaming the response as SSE ChatStreamChunks"""
+
+            history = chat_history(args)
+
+            async def token_stream():
+                # Runs in the streaming task, so the context is set up here
+                set_chat_context(request, args)
+                tokens = self.agent.chat_stream(
+                    identity=args.identity,
+                    team=args.team,
+                    role=args.role,
+                    chat_history=history,
+                )
+                response = []
+                try:
+                    while True:
+                        try:
+                            token = await asyncio.wait_for(
+                                tokens.__anext__(), timeout=get_remaining_time()
+                            )
+                        except StopAsyncIteration:
+                            remember_response(args, "".join(response))
+                            break
+                        response.append(token)
+                        yield sse_frame(dumps({"token": token}))
+                except asyncio.TimeoutError:
+                    yield sse_frame(dumps({"error": "Deadline exceeded"}))
+                except Exception as e:
+                    logger.debug("Chat stream failed: %s", e)
+                    yield sse_frame(dumps({"error": str(e)}))
+                finally:
+                    await tokens.aclose()
+
+            response = StreamingResponse(token_stream(), media_type="text/event-stream")
+            response.headers["Cache-Control"] = "no-cache"
+            return response
 
         @self.app.post("/tasks")
-        async def execute_task(args: ExecuteTaskArgs) -> bool:
+        async def execute_task(request: Request, args: ExecuteTaskArgs) -> bool:
             """Execute a task on the agent"""
+            if self.draining:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Agent is shutting down",
+                    headers={"Retry-After": "1"},
+                )
             set_agent_activity_context(
                 execution_id=args.task,
                 execution_type=ExecutionType.TASK,
@@ -75,9 +278,40 @@ class Entrypoint:
                 team=args.assignment.team_name,
                 role=args.assignment.role_name,
             )
+            # Carried over to the task, which is cancelled once it's past
+            set_deadline(request, self.config.task_timeout)
             try:
-                await self.agent.ack_task(args.task, args.description, args.assignment)
+                if self.ack_task_takes_priority:
+                    await self.agent.ack_task(
+                        args.task,
+                        args.description,
+                        args.assignment,
+                        priority=args.priority,
+                    )
+                else:
+                    if args.priority:
+                        logger.debug(
+                            "Ignoring priority of task %s (not supported by agent)",
+                            args.task,
+                        )
+                    await self.agent.ack_task(
+                        args.task, args.description, args.assignment
+                    )
                 return True
+            except errors.RosterAgentShuttingDown as e:
+                raise HTTPException(
+                    status_code=503, detail=str(e), headers={"Retry-After": "1"}
+                )
+            except errors.RosterAgentTaskQueueFull as e:
+                # Fail fast, and tell the caller how backed up the agent is
+                raise HTTPException(
+                    status_code=429,
+                    detail=str(e),
+                    headers={
+                        "Retry-After": str(math.ceil(e.retry_after)),
+                        "X-Roster-Queue-Depth": str(e.queue_depth),
+                    },
+                )
             except errors.RosterAgentTaskAlreadyExists as e:
                 raise HTTPException(status_code=409, detail=str(e))
             except Exception as e:
@@ -94,26 +328,71 @@ class Entrypoint:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/activity/{execution_id}")
+        async def activity(execution_id: str, since: int = 0) -> Response:
+            """Replay the activity of an execution after the given event id"""
+            if self.activity_log is None:
+                raise HTTPException(status_code=404, detail="Activity log disabled")
+            events = await self.activity_log.aread_execution(execution_id, since)
+            content = b",".join(
+                b'{"id":%d,"event":%s}' % (event_id, payload)
+                for event_id, payload in events
+            )
+            return Response(b"[" + content + b"]", media_type="application/json")
+
         @self.app.get("/activity-stream")
         async def events(request: Request):
-            def listener(event: ActivityEvent):
-                self.activity_stream.put_nowait(event.serialize() + b"\n\n")
+            last_event_id = request.headers.get("Last-Event-ID")
 
             async def event_stream():
+                replayed_until = 0
+                # Subscribed once streaming starts, so that the subscription is
+                # always ended by the finally below (even if the client goes away
+                # before the first chunk), and before replaying, so that nothing
+                # is missed in between
+                subscription = self.activity_broker.subscribe()
                 try:
+                    if self.activity_log is not None and last_event_id:
+                        try:
+                            since = int(last_event_id)
+                        except ValueError:
+                            since = self.activity_broker.last_event_id
+                        # In batches, so that a stale id doesn't load the whole log
+                        async for missed in self.activity_log.aiter_since(since):
+                            replayed_until = missed[-1][0]
+                            yield b"".join(
+                                sse_frame(payload, event_id=event_id)
+                                for event_id, payload in missed
+                            )
                     while True:
                         if await request.is_disconnected():
                             logger.debug(f"Client disconnected ({request.client.host})")
                             break
 
-                        result = await self.activity_stream.get()
-                        logger.debug(f"SSE Send ({request.client.host})")
-                        yield result
-                except asyncio.CancelledError:
+                        items = await subscription.get(
+                            timeout=self.config.activity_stream_heartbeat
+                        )
+                        if items is None:
+                            logger.debug(
+                                f"Disconnecting slow SSE client ({request.client.host})"
+                            )
+                            break
+                        if not items:
+                            # Keeps the connection alive, and detects dead clients
+                            yield b": heartbeat\n\n"
+                            continue
+                        # Everything buffered goes out in a single chunk
+                        chunk = b"".join(
+                            frame
+                            for event_id, frame in items
+                            if event_id > replayed_until
+                        )
+                        if chunk:
+                            logger.debug("SSE Send (%s)", request.client.host)
+                            yield chunk
+                finally:
                     logger.debug(f"Stopping SSE stream for {request.client.host}")
-                    get_roster_activity_logger().remove_listener(listener)
-
-            get_roster_activity_logger().add_listener(listener)
+                    self.activity_broker.unsubscribe(subscription)
 
             response = StreamingResponse(event_stream(), media_type="text/event-stream")
             response.headers["Cache-Control"] = "no-cache"
@@ -129,4 +408,13 @@ class Entrypoint:
                 "Invalid Roster Agent configuration. Verify environment variables."
             )
 
-        uvicorn.run(self.app, host="0.0.0.0", port=self.config.roster_agent_port)
+        server = DrainingServer(
+            uvicorn.Config(
+                self.app,
+                host="0.0.0.0",
+                port=self.config.roster_agent_port,
+                timeout_graceful_shutdown=self.config.shutdown_drain_timeout,
+            ),
+            entrypoint=self,
+        )
+        server.run()
@@ -15,3 +15,16 @@ class RosterAgentTaskNotFound(RosterAgentTaskException):
 
 class RosterAgentTaskAlreadyExists(RosterAgentTaskException):
     """Raised when a task already exists"""
+
+
+class RosterAgentTaskQueueFull(RosterAgentTaskException):
+    """Raised when the agent can't accept any more tasks for now"""
+
+    def __init__(self, message, queue_depth: int, retry_after: float):
+        super().__init__(message)
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class RosterAgentShuttingDown(RosterAgentTaskException):
+    """Raised when the agent is shutting down, and won't accept new tasks"""
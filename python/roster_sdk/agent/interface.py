@@ -1,12 +1,16 @@
 from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Optional
 
 from roster_sdk.client import errors as client_errors
 from roster_sdk.client.agent.task.manager import TaskManager
+from roster_sdk.client.base import get_roster_client
 from roster_sdk.config import AgentConfig
 from roster_sdk.models.chat import ChatMessage
 from roster_sdk.models.resources.task import TaskAssignment
 
 from . import errors
+from .context import get_remaining_time
+from .workers import ExecutionMode, ProcessWorkers, ThreadWorkers
 
 
 class RosterAgentInterface(ABC):
@@ -16,23 +20,77 @@ class RosterAgentInterface(ABC):
     ) -> str:
         """Respond to a prompt"""
 
+    async def chat_stream(
+        self, identity: str, team: str, role: str, chat_history: list[ChatMessage]
+    ) -> AsyncIterator[str]:
+        """Respond to a prompt, yielding the response as it is generated
+
+        By default, the whole response from chat is yielded at once.
+        """
+        yield await self.chat(identity, team, role, chat_history)
+
     @abstractmethod
-    async def ack_task(self, name: str, description: str, assignment: TaskAssignment):
-        """Acknowledge and begin executing a task on the agent"""
+    async def ack_task(
+        self,
+        name: str,
+        description: str,
+        assignment: TaskAssignment,
+        priority: int = 0,
+    ):
+        """Acknowledge and begin (or queue) executing a task on the agent"""
 
     @abstractmethod
     async def cancel_task(self, task: str):
         """Cancel a task"""
 
+    async def startup(self):
+        """Called when the agent starts serving requests"""
+
+    async def shutdown(self):
+        """Called when the agent stops serving requests"""
+
 
 class BaseRosterAgent(RosterAgentInterface, ABC):
     def __init__(self):
         self.config = AgentConfig.from_env()
-        self.task_manager = TaskManager.from_env(self.config.roster_agent_name)
+        self.client = get_roster_client()
+        self.task_manager = TaskManager.from_env(
+            self.config.roster_agent_name, client=self.client
+        )
+        self.task_workers: Optional[ThreadWorkers] = None
+        if ExecutionMode(self.config.task_execution_mode) == ExecutionMode.THREAD:
+            self.task_workers = ThreadWorkers(
+                self.config.task_workers, client=self.client
+            )
+        # Created on first use
+        self.process_workers: Optional[ProcessWorkers] = None
 
-    async def ack_task(self, name: str, description: str, assignment: TaskAssignment):
+    async def ack_task(
+        self,
+        name: str,
+        description: str,
+        assignment: TaskAssignment,
+        priority: int = 0,
+    ):
         try:
-            self.task_manager.run_task(self.execute_task, name, description, assignment)
+            executor = (
+                self.execute_task
+                if self.task_workers is None
+                else self._execute_task_on_worker
+            )
+            self.task_manager.run_task(
+                executor, name, description, assignment, priority=priority
+            )
+        except client_errors.TaskManagerDraining:
+            raise errors.RosterAgentShuttingDown(
+                f"Agent {self.agent_name} is shutting down"
+            )
+        except client_errors.TaskQueueFull as e:
+            raise errors.RosterAgentTaskQueueFull(
+                f"Agent {self.agent_name} is busy: {e.message}",
+                queue_depth=e.queue_depth,
+                retry_after=e.retry_after,
+            )
         except client_errors.TaskManagerException:
             raise errors.RosterAgentTaskNotFound(
                 f"Failed to run task {name} on agent {assignment.agent_name}"
@@ -44,6 +102,36 @@ class BaseRosterAgent(RosterAgentInterface, ABC):
         except client_errors.TaskManagerException:
             raise errors.RosterAgentTaskException(f"Failed to cancel task {task}")
 
+    async def _execute_task_on_worker(
+        self, name: str, description: str, assignment: TaskAssignment
+    ) -> str:
+        return await self.task_workers.run(
+            self.execute_task, name, description, assignment
+        )
+
+    async def run_in_process(self, func: Callable, *args) -> Any:
+        """Run a CPU-bound (picklable) function on the agent's process pool"""
+        if self.process_workers is None:
+            self.process_workers = ProcessWorkers(self.config.process_workers)
+        return await self.process_workers.run(func, *args)
+
+    async def startup(self):
+        await self.task_manager.start()
+
+    async def shutdown(self):
+        # Shares its budget with whatever already ran of the shutdown (e.g. the
+        # entrypoint waiting for connections to close)
+        drain_timeout = self.config.shutdown_drain_timeout
+        remaining = get_remaining_time()
+        if remaining is not None:
+            drain_timeout = max(0.0, min(drain_timeout, remaining))
+        await self.task_manager.aclose(drain_timeout=drain_timeout)
+        if self.task_workers is not None:
+            await self.task_workers.aclose()
+        if self.process_workers is not None:
+            self.process_workers.shutdown()
+        await self.client.aclose()
+
     @abstractmethod
     async def execute_task(
         self, name: str, description: str, assignment: TaskAssignment
@@ -1,19 +1,57 @@
+import asyncio
+import atexit
+import gzip
 import logging
 import logging.handlers
+import os
+import queue
+import shutil
+from datetime import datetime, timezone
+from typing import Optional
 
 from roster_sdk import constants
 from roster_sdk.agent.context import get_agent_activity_context
 from roster_sdk.config import AgentConfig
-from roster_sdk.models.api.activity import ActivityEvent, ActivityType
+from roster_sdk.models.api.activity import ActivityRecord, ActivityType
+from roster_sdk.serialization import dumps
 
 logger = logging.getLogger(constants.AGENT_LOGGER_NAME)
 logger.setLevel(logging.DEBUG)
 
 logs_enabled = False
+log_listener: Optional[logging.handlers.QueueListener] = None
+log_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return dumps(entry).decode("utf-8")
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
 
 
 def ensure_logging():
-    global logs_enabled
+    global logs_enabled, log_listener, log_queue_handler
     if logs_enabled:
         # logging already setup,
         # don't add new handlers
@@ -27,18 +65,55 @@ def ensure_logging():
     console_log_format = "%(levelname)s:\t [log] %(message)s"
     console_format = logging.Formatter(console_log_format)
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
 
-    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=1000000)
-    file_handler.setLevel(logging.DEBUG)
-    file_log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    file_format = logging.Formatter(file_log_format)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=config.roster_agent_log_max_bytes,
+        backupCount=config.roster_agent_log_backup_count,
+    )
+    # Rotated files are gzipped (e.g. roster-agent.log.1.gz)
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setLevel(config.roster_agent_log_level)
+    if config.roster_agent_log_format == "json":
+        file_format = JsonLinesFormatter()
+    else:
+        file_log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        file_format = logging.Formatter(file_log_format)
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+
+    # Handlers run on a background thread, so that logging never blocks
+    # the event loop on disk (or console) writes
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log_queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(log_queue_handler)
+    # Records no handler wants are dropped before any formatting work
+    logger.setLevel(min(console_handler.level, file_handler.level))
+    log_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    log_listener.start()
+    atexit.register(stop_logging)
 
     logs_enabled = True
 
 
+def stop_logging():
+    """Write out any queued records, stop the background writer and close
+    its handlers (ensure_logging sets them up again)
+    """
+    global logs_enabled, log_listener, log_queue_handler
+    if log_queue_handler is not None:
+        logger.removeHandler(log_queue_handler)
+        log_queue_handler = None
+    if log_listener is not None:
+        log_listener.stop()
+        for handler in log_listener.handlers:
+            handler.close()
+        log_listener = None
+    logs_enabled = False
+
+
 def get_logger():
     ensure_logging()
     return logger
@@ -47,30 +122,49 @@ def get_logger():
 class ActivityLogger:
     def __init__(self):
         self.listeners = []
+        # Listeners run on the event loop they were added from
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
 
     def add_listener(self, listener):
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
         self.listeners.append(listener)
 
     def remove_listener(self, listener):
         self.listeners.remove(listener)
 
-    def _notify_listeners(self, event: ActivityEvent):
+    def _notify_listeners(self, event: ActivityRecord):
         for listener in self.listeners:
             listener(event)
 
+    def emit(self, event: ActivityRecord):
+        """Notify listeners, handing the event over to their loop if need be"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self.loop is None or running is self.loop or self.loop.is_closed():
+            self._notify_listeners(event)
+        else:
+            # e.g. sent from a task running on a worker thread
+            self.loop.call_soon_threadsafe(self._notify_listeners, event)
+
     def _send_event(self, event_type: ActivityType, message: str):
         context = get_agent_activity_context()
         if context is None:
             return
         agent_ctx, execution_ctx = context
-        event = ActivityEvent(
-            execution_id=execution_ctx.execution_id,
-            execution_type=execution_ctx.execution_type,
-            type=event_type,
-            content=message,
-            agent_context=agent_ctx,
+        self.emit(
+            ActivityRecord(
+                execution_ctx.execution_id,
+                execution_ctx.execution_type,
+                event_type,
+                message,
+                agent_ctx,
+            )
         )
-        self._notify_listeners(event)
 
     def thought(self, message: str):
         self._send_event(ActivityType.THOUGHT, message)
@@ -0,0 +1,140 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from roster_sdk.client.base import RosterClient, get_roster_client
+from roster_sdk.models.api.activity import (
+    ActivityRecord,
+    AgentContextRecord,
+    ExecutionContextRecord,
+)
+
+from .context import agent_context, agent_execution_context, get_agent_activity_context
+from .logs import get_roster_activity_logger
+
+
+class ExecutionMode(Enum):
+    # Tasks run on the agent's event loop
+    ASYNC = "async"
+    # Tasks run on a pool of threads, each with its own event loop
+    THREAD = "thread"
+
+
+class ThreadWorkers:
+    """Runs coroutine functions on a bounded pool of threads.
+
+    Each thread has its own (long-lived) event loop, and calls run with
+    a copy of the caller's contextvars, including the activity context.
+    Cancelling the caller cancels the call on its worker.
+    The loops, and the sessions client opened on them, are closed by aclose.
+    """
+
+    def __init__(self, max_workers: int, client: Optional[RosterClient] = None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="roster-task"
+        )
+        self.client = client
+        self.loops: list[asyncio.AbstractEventLoop] = []
+        self._local = threading.local()
+
+    def _loop(self) -> asyncio.AbstractEventLoop:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = self._local.loop = asyncio.new_event_loop()
+            self.loops.append(loop)
+        return loop
+
+    def _run(self, func: Callable, args: tuple, handle: dict) -> Any:
+        loop = self._loop()
+        # The task is created inside the caller's (copied) context
+        task = loop.create_task(func(*args))
+        handle["worker"] = (loop, task)
+        return loop.run_until_complete(task)
+
+    async def run(self, func: Callable, *args) -> Any:
+        context = contextvars.copy_context()
+        handle: dict = {}
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, context.run, self._run, func, args, handle
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if "worker" in handle:
+                loop, task = handle["worker"]
+                loop.call_soon_threadsafe(task.cancel)
+            raise
+
+    @staticmethod
+    async def _close_loop(client: RosterClient):
+        # e.g. watchers started by tasks on this loop
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await client.aclose()
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+    def _shutdown(self, client: RosterClient):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        # The worker threads are done with their loops by now
+        for loop in self.loops:
+            try:
+                loop.run_until_complete(self._close_loop(client))
+            finally:
+                loop.close()
+        self.loops = []
+
+    async def aclose(self):
+        """Stop the workers, then close their event loops and client sessions"""
+        client = self.client or get_roster_client()
+        # Waits for running calls to finish, so not on the caller's loop
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown, client)
+
+
+def _run_in_process(
+    context: Optional[tuple[AgentContextRecord, ExecutionContextRecord]],
+    func: Callable,
+    args: tuple,
+) -> tuple[Any, list[ActivityRecord]]:
+    # Activity events can't be streamed out of the worker process,
+    # so they are collected and sent along with the result.
+    events: list[ActivityRecord] = []
+    if context is not None:
+        agent_context.set(context[0])
+        agent_execution_context.set(context[1])
+    activity_logger = get_roster_activity_logger()
+    # Listeners inherited from the agent process (when forked) don't work here
+    activity_logger.listeners, activity_logger.loop = [events.append], None
+    result = func(*args)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return result, events
+
+
+class ProcessWorkers:
+    """Runs CPU-bound functions on a bounded pool of processes.
+
+    Functions (and their arguments and results) must be picklable.
+    The activity context is carried over, and activity events sent
+    by the function are passed on to the ActivityLogger once it returns.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+
+    async def run(self, func: Callable, *args) -> Any:
+        result, events = await asyncio.get_running_loop().run_in_executor(
+            self.executor, _run_in_process, get_agent_activity_context(), func, args
+        )
+        activity_logger = get_roster_activity_logger()
+        for event in events:
+            activity_logger.emit(event)
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
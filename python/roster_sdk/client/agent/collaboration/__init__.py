@@ -1 +1,2 @@
 from .interface import CollaborationInterface
+from .snapshot import TeamSnapshot
@@ -1,9 +1,22 @@
-from typing import Optional, TypeVar, Union
+import dataclasses
+import logging
+import time
+from typing import Callable, Optional, TypeVar, Union
 
+from roster_sdk import config
+from roster_sdk.agent.context import set_agent_deadline
 from roster_sdk.client import errors
-from roster_sdk.client.base import RosterClient
+from roster_sdk.client.base import (
+    DEFAULT_BULK_CONCURRENCY,
+    RosterClient,
+    _map_bounded,
+    get_roster_client,
+)
 from roster_sdk.models.chat import ChatMessage
 from roster_sdk.models.client.role import RoleContext
+from roster_sdk.models.resources.team_layout import TeamLayoutResource
+
+from .snapshot import TeamSnapshot
 
 T = TypeVar("T")
 
@@ -11,34 +24,83 @@ T = TypeVar("T")
 # we can use a string to represent an error message.
 Result = Union[str, T]
 
+logger = logging.getLogger(__name__)
+
 
 class CollaborationInterface:
-    def __init__(self, team: str, role: str, client: Optional[RosterClient] = None):
+    """Tools for an agent to work with the rest of its team.
+
+    Lookups go through a snapshot of the team, refreshed at most every
+    snapshot_ttl seconds (and only rebuilt if the team or its layout changed).
+    The team's layout is the team layout named after the team's type.
+    """
+
+    def __init__(
+        self,
+        team: str,
+        role: str,
+        client: Optional[RosterClient] = None,
+        snapshot_ttl: float = config.ROSTER_TEAM_SNAPSHOT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.team = team
         self.role = role
-        self.client = client or RosterClient.from_env()
+        self.client = client or get_roster_client()
+        self.snapshot_ttl = snapshot_ttl
+        self.clock = clock
+        # Teammates asked at once by ask_team_members
+        self.ask_concurrency = DEFAULT_BULK_CONCURRENCY
+        self._snapshot: Optional[TeamSnapshot] = None
+
+    async def _get_layout(self, name: str) -> Optional[TeamLayoutResource]:
+        if not name:
+            return None
+        try:
+            return await self.client.team_layout.get(name)
+        except errors.ResourceNotFound:
+            return None
+        except errors.RosterClientException as e:
+            logger.debug("(collaboration) Failed to fetch team layout %s: %s", name, e)
+            return None
+
+    async def get_snapshot(self) -> TeamSnapshot:
+        """The team's snapshot, refreshed if it has expired.
+
+        Raises RosterClientException if the team can't be fetched.
+        """
+        now = self.clock()
+        snapshot = self._snapshot
+        if snapshot is not None and now - snapshot.taken_at < self.snapshot_ttl:
+            return snapshot
+        team = await self.client.team.get(self.team)
+        layout = await self._get_layout(team.spec.type)
+        if snapshot is not None and snapshot.team is team and snapshot.layout is layout:
+            # Served from the client's cache, so nothing changed
+            snapshot = dataclasses.replace(snapshot, taken_at=now)
+        else:
+            snapshot = TeamSnapshot.build(team, layout, taken_at=now)
+        self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
 
     async def get_role_context(self) -> Result[RoleContext]:
         try:
-            team_resource = await self.client.team.get(self.team)
+            snapshot = await self.get_snapshot()
         except errors.RosterClientException:
             return "Team not found."
-        role = team_resource.get_role(self.role)
+        role = snapshot.get_role(self.role)
         if role is None:
             return "Role not found."
         return RoleContext.from_role(
             team_name=self.team, role_name=self.role, role=role
         )
 
-    async def ask_team_member(
-        self, member_role: str, question: str
+    async def _ask(
+        self, snapshot: TeamSnapshot, member_role: str, question: str
     ) -> Result[ChatMessage]:
-        try:
-            team_resource = await self.client.team.get(self.team)
-        except errors.RosterClientException:
-            return "Team not found."
-
-        agent_identity = team_resource.get_member_by_role(self.role)
+        agent_identity = snapshot.get_member(self.role)
         if agent_identity is None:
             return "Agent not found."
 
@@ -49,5 +111,57 @@ class CollaborationInterface:
                 history=[],
                 message=ChatMessage(sender=agent_identity.identity, message=question),
             )
+        except (errors.DeadlineExceeded, errors.RequestTimeout):
+            return "Team member did not answer in time."
         except errors.RosterClientException:
             return "Failed to send message to team member."
+
+    async def ask_team_member(
+        self, member_role: str, question: str
+    ) -> Result[ChatMessage]:
+        try:
+            snapshot = await self.get_snapshot()
+        except errors.RosterClientException:
+            return "Team not found."
+        return await self._ask(snapshot, member_role, question)
+
+    async def ask_manager(self, question: str) -> Result[ChatMessage]:
+        try:
+            snapshot = await self.get_snapshot()
+        except errors.RosterClientException:
+            return "Team not found."
+        manager_role = snapshot.get_manager(self.role)
+        if manager_role is None:
+            return "Manager not found."
+        return await self._ask(snapshot, manager_role, question)
+
+    async def ask_team_members(
+        self, member_roles: list[str], question: str, timeout: Optional[float] = None
+    ) -> Result[dict[str, Result[ChatMessage]]]:
+        """Ask several teammates the same question at once.
+
+        Returns each role's answer (or error). Teammates that haven't answered
+        within timeout seconds are reported as such, without holding up the rest.
+        """
+        try:
+            snapshot = await self.get_snapshot()
+        except errors.RosterClientException:
+            return "Team not found."
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async def ask(member_role: str) -> Result[ChatMessage]:
+            # Each ask runs in its own task (and context), so the
+            # deadline doesn't outlive it
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return "Team member did not answer in time."
+                set_agent_deadline(remaining)
+            return await self._ask(snapshot, member_role, question)
+
+        member_roles = list(dict.fromkeys(member_roles))
+        results = await _map_bounded(ask, member_roles, self.ask_concurrency)
+        return {
+            member_role: result.value if result.ok else str(result.error)
+            for member_role, result in zip(member_roles, results)
+        }
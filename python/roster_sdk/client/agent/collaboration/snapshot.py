@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from roster_sdk.models.resources.team import Member, Role, TeamResource
+from roster_sdk.models.resources.team_layout import TeamLayoutResource
+
+
+@dataclass(frozen=True)
+class TeamSnapshot:
+    """Point-in-time view of a team, indexed by role name.
+
+    Peer and management groups come from the team's layout (if it has one):
+    peer groups map a group name to its roles, and management groups map
+    a manager's role to the roles it manages.
+    """
+
+    team: TeamResource
+    layout: Optional[TeamLayoutResource]
+    taken_at: float
+    roles: dict[str, Role] = field(default_factory=dict)
+    members: dict[str, Member] = field(default_factory=dict)
+    # role -> other roles sharing a peer group with it
+    peers: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    # role -> role of its manager
+    managers: dict[str, str] = field(default_factory=dict)
+    # manager role -> roles it manages
+    reports: dict[str, tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        team: TeamResource,
+        layout: Optional[TeamLayoutResource],
+        taken_at: float,
+    ) -> "TeamSnapshot":
+        # The first role with a given name wins, like TeamSpec.get_role
+        roles = {}
+        for role in team.spec.layout.roles:
+            roles.setdefault(role.name, role)
+
+        peers: dict[str, list[str]] = {}
+        managers, reports = {}, {}
+        if layout is not None:
+            for group in layout.spec.peer_groups.values():
+                for role in group:
+                    role_peers = peers.setdefault(role, [])
+                    role_peers.extend(
+                        peer
+                        for peer in group
+                        if peer != role and peer not in role_peers
+                    )
+            for manager, managed in layout.spec.management_groups.items():
+                reports[manager] = tuple(managed)
+                for role in managed:
+                    managers.setdefault(role, manager)
+
+        return cls(
+            team=team,
+            layout=layout,
+            taken_at=taken_at,
+            roles=roles,
+            members=dict(team.spec.members),
+            peers={role: tuple(role_peers) for role, role_peers in peers.items()},
+            managers=managers,
+            reports=reports,
+        )
+
+    def get_role(self, role: str) -> Optional[Role]:
+        return self.roles.get(role)
+
+    def get_member(self, role: str) -> Optional[Member]:
+        return self.members.get(role)
+
+    def get_manager(self, role: str) -> Optional[str]:
+        return self.managers.get(role)
+
+    def get_peers(self, role: str) -> tuple[str, ...]:
+        return self.peers.get(role, ())
@@ -1,23 +1,104 @@
-from typing import TypeVar, Union
+import asyncio
+import logging
+from typing import Optional, Sequence, TypeVar, Union
 
-from roster_sdk.client.base import RosterClient
-from roster_sdk.models.resources.task import TaskAssignment, TaskStatus
+from roster_sdk import config
+from roster_sdk.agent.context import get_agent_activity_context, get_remaining_time
+from roster_sdk.client import errors
+from roster_sdk.client.base import (
+    DEFAULT_BULK_CONCURRENCY,
+    BulkResult,
+    RosterClient,
+    _map_bounded,
+    get_roster_client,
+)
+from roster_sdk.models.api.activity import ExecutionType
+from roster_sdk.models.resources.task import TaskAssignment, TaskSpec, TaskStatus
+
+from .outbox import StatusUpdateOutbox
+from .pipeline import StatusUpdatePipeline
+from .subtasks import TaskCompletionWatcher
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
 # A bit strange, but since this interface is for text I/O based Agents,
 # we can use a string to represent an error message.
 Result = Union[str, T]
 
 
+def _deadline_passed() -> bool:
+    remaining = get_remaining_time()
+    return remaining is not None and remaining <= 0
+
+
 class TaskInterface:
-    def __init__(self, agent_name: str, client: RosterClient):
+    def __init__(
+        self,
+        agent_name: str,
+        client: RosterClient,
+        status_updates: Optional[StatusUpdatePipeline] = None,
+        subtask_connect_timeout: float = config.ROSTER_SUBTASK_CONNECT_TIMEOUT,
+        subtask_poll_interval: float = config.ROSTER_SUBTASK_POLL_INTERVAL,
+    ):
         self.agent_name = agent_name
         self.client = client
+        # When set, status updates are batched instead of sent one at a time
+        self.status_updates = status_updates
+        # How long subtasks wait for the events stream before polling instead
+        self.subtask_connect_timeout = subtask_connect_timeout
+        self.subtask_poll_interval = subtask_poll_interval
+        # Started when the first subtask is dispatched, one per event loop
+        # (e.g. for tasks running on worker threads)
+        self.subtask_watchers: dict[
+            asyncio.AbstractEventLoop, TaskCompletionWatcher
+        ] = {}
 
     @classmethod
-    def from_env(cls, agent_name: str) -> "TaskInterface":
-        return cls(agent_name, RosterClient.from_env())
+    def from_env(
+        cls, agent_name: str, client: Optional[RosterClient] = None
+    ) -> "TaskInterface":
+        client = client or get_roster_client()
+        outbox = None
+        if config.ROSTER_STATUS_UPDATE_OUTBOX:
+            outbox = StatusUpdateOutbox(config.ROSTER_STATUS_UPDATE_OUTBOX)
+        status_updates = None
+        if config.ROSTER_STATUS_UPDATE_BATCH_SIZE > 0 or outbox is not None:
+            status_updates = StatusUpdatePipeline(
+                client,
+                max_batch_size=max(config.ROSTER_STATUS_UPDATE_BATCH_SIZE, 1),
+                flush_interval=config.ROSTER_STATUS_UPDATE_FLUSH_INTERVAL,
+                outbox=outbox,
+            )
+        return cls(agent_name, client, status_updates=status_updates)
+
+    async def start(self):
+        if self.status_updates is not None:
+            await self.status_updates.start()
+
+    @property
+    def subtask_watcher(self) -> TaskCompletionWatcher:
+        """The running event loop's watcher"""
+        loop = asyncio.get_running_loop()
+        watcher = self.subtask_watchers.get(loop)
+        if watcher is None:
+            # Watchers of loops that have since been closed are gone with them
+            for other in [
+                other for other in self.subtask_watchers if other.is_closed()
+            ]:
+                del self.subtask_watchers[other]
+            watcher = self.subtask_watchers[loop] = TaskCompletionWatcher(self.client)
+            watcher.start()
+        return watcher
+
+    async def aclose(self):
+        # Watchers on other loops are stopped along with their loop
+        watcher = self.subtask_watchers.pop(asyncio.get_running_loop(), None)
+        if watcher is not None:
+            await watcher.stop()
+        if self.status_updates is not None:
+            await self.status_updates.aclose()
 
     async def finish_task(
         self,
@@ -48,8 +129,98 @@ class TaskInterface:
             "name": task,
             "status": updated_task_status.dict(),
         }
-        await self.client.status_update(status_update_event)
+        if self.status_updates is not None:
+            self.status_updates.submit(status_update_event)
+        else:
+            await self.client.status_update(status_update_event)
+
+    async def _parent_spec(self) -> Optional[TaskSpec]:
+        """The spec of the task being executed, if any"""
+        activity_context = get_agent_activity_context()
+        if activity_context is None:
+            return None
+        _, execution_ctx = activity_context
+        if execution_ctx.execution_type != ExecutionType.TASK:
+            return None
+        try:
+            return (await self.client.task.get(execution_ctx.execution_id)).spec
+        except errors.ResourceNotFound:
+            return TaskSpec(name=execution_ctx.execution_id, description="")
+
+    @staticmethod
+    def _timeout(timeout: float) -> float:
+        """timeout, cut short by the deadline"""
+        if _deadline_passed():
+            raise asyncio.TimeoutError()
+        remaining = get_remaining_time()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    async def _wait_for_subtask(
+        self, watcher: TaskCompletionWatcher, name: str, completion: asyncio.Future
+    ) -> TaskStatus:
+        while True:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(completion),
+                    timeout=self._timeout(self.subtask_poll_interval),
+                )
+            except asyncio.TimeoutError:
+                if _deadline_passed():
+                    raise
+            if not watcher.connected.is_set():
+                # Events may not be arriving, so check in on the task
+                status = await watcher.poll(name)
+                if status is not None:
+                    return status
+
+    async def _run_subtask(self, spec: TaskSpec) -> str:
+        watcher = self.subtask_watcher
+        # Listen before creating the task, so that its completion can't be missed
+        completion = watcher.wait_for(spec.name)
+        try:
+            try:
+                await asyncio.wait_for(
+                    watcher.connected.wait(),
+                    timeout=self._timeout(self.subtask_connect_timeout),
+                )
+            except asyncio.TimeoutError:
+                if _deadline_passed():
+                    raise
+                logger.warning(
+                    "(subtasks) Resource events unavailable, polling subtask %s",
+                    spec.name,
+                )
+            await self.client.task.create(spec.dict())
+            status = await self._wait_for_subtask(watcher, spec.name, completion)
+        except asyncio.TimeoutError:
+            raise errors.DeadlineExceeded(f"Subtask {spec.name} didn't finish in time")
+        finally:
+            completion.cancel()
+        if status.status != "success":
+            raise errors.SubtaskFailed(spec.name, status)
+        return status.result
+
+    async def gather_subtasks(
+        self,
+        subtasks: Sequence[tuple[str, str]],
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> "list[BulkResult[str]]":
+        """Create (name, description) subtasks of the current task,
+        and wait for their results, with at most concurrency running at once.
+
+        Results are in input order, with an error for each subtask that failed.
+        """
+        parent = await self._parent_spec()
+        specs = [
+            TaskSpec(name=name, description=description, parent=parent)
+            for name, description in subtasks
+        ]
+        return await _map_bounded(self._run_subtask, specs, concurrency)
 
     async def execute_subtask(self, task: str, description: str) -> str:
         """Asynchronously execute a subtask and receive its result"""
-        return "This isn't implemented yet"
+        [result] = await self.gather_subtasks([(task, description)])
+        if not result.ok:
+            error = result.error.args[0] if result.error.args else result.error
+            return f"Subtask {task} failed: {error}"
+        return result.value
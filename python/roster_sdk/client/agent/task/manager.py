@@ -1,8 +1,16 @@
 import asyncio
+import contextvars
 import logging
-from typing import Callable, Coroutine
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Coroutine, Optional
 
+from roster_sdk import config
+from roster_sdk.agent.context import agent_deadline, get_remaining_time
 from roster_sdk.client import errors
+from roster_sdk.client.base import RosterClient
 from roster_sdk.models.resources.task import TaskAssignment
 
 from .interface import TaskInterface
@@ -13,14 +21,87 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
+@dataclass
+class ScheduledTask:
+    executor: TaskExecutor
+    name: str
+    description: str
+    assignment: TaskAssignment
+    priority: int = 0
+    # The submitter's context (activity context and deadline) the task runs in
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def team(self) -> str:
+        return self.assignment.team_name if self.assignment else ""
+
+    @property
+    def wait_time(self) -> float:
+        return (self.started_at or time.monotonic()) - self.enqueued_at
+
+    @property
+    def run_time(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+@dataclass
+class SchedulerStats:
+    started: int = 0
+    finished: int = 0
+    rejected: int = 0
+    total_wait_time: float = 0.0
+    total_run_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    @property
+    def average_run_time(self) -> float:
+        return self.total_run_time / self.finished if self.finished else 0.0
+
+
 class TaskManager:
-    def __init__(self, task_interface: TaskInterface):
+    """Runs at most max_concurrency tasks at once.
+
+    Other tasks wait in a bounded queue: higher priorities run first,
+    and within a priority, teams take turns (FIFO within each team)
+    so that one busy team can't starve the others.
+    """
+
+    def __init__(
+        self,
+        task_interface: TaskInterface,
+        max_concurrency: int = 8,
+        max_pending: int = 100,
+    ):
         self.task_interface = task_interface
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
         self.running_tasks: dict[str, asyncio.Task] = {}
+        self.scheduled: dict[str, ScheduledTask] = {}
+        # priority -> team -> tasks, in the order teams take turns
+        self.pending: dict[int, OrderedDict[str, deque[ScheduledTask]]] = {}
+        self.pending_count = 0
+        self.stats = SchedulerStats()
+        # Set once shutdown starts, after which new tasks are rejected
+        self.draining = False
 
     @classmethod
-    def from_env(cls, agent_name: str) -> "TaskManager":
-        return cls(TaskInterface.from_env(agent_name))
+    def from_env(
+        cls, agent_name: str, client: Optional[RosterClient] = None
+    ) -> "TaskManager":
+        return cls(
+            TaskInterface.from_env(agent_name, client=client),
+            max_concurrency=config.ROSTER_AGENT_MAX_CONCURRENT_TASKS,
+            max_pending=config.ROSTER_AGENT_MAX_PENDING_TASKS,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self.pending_count
 
     async def _finish_task(
         self,
@@ -30,6 +111,8 @@ class TaskManager:
         result: str,
         error: str,
     ):
+        # The outcome is reported even if the task ran out of time
+        token = agent_deadline.set(None)
         try:
             await self.task_interface.finish_task(
                 task, description, assignment, result=result, error=error
@@ -37,18 +120,33 @@ class TaskManager:
         except errors.RosterClientException as e:
             logger.error("Failed to finalize task: %s", task)
             logger.debug("(task-manager) Failed to finalize task %s: %s", task, e)
+        finally:
+            agent_deadline.reset(token)
 
-    async def _run_task(
-        self,
-        task_executor: TaskExecutor,
-        name: str,
-        description: str,
-        assignment: TaskAssignment,
-    ):
+    async def _run_task(self, scheduled: ScheduledTask):
+        name, description, assignment = (
+            scheduled.name,
+            scheduled.description,
+            scheduled.assignment,
+        )
         try:
-            result = await task_executor(name, description, assignment)
+            # Time spent queued counts towards the task's deadline
+            result = await asyncio.wait_for(
+                scheduled.executor(name, description, assignment),
+                timeout=get_remaining_time(),
+            )
         except asyncio.CancelledError:
             logger.info("Cancelled task %s", name)
+        except asyncio.TimeoutError as e:
+            remaining = get_remaining_time()
+            if remaining is not None and remaining <= 0:
+                logger.info("Task %s ran past its deadline", name)
+                error = "Deadline exceeded"
+            else:
+                error = str(e) or "Timed out"
+            await self._finish_task(
+                name, description, assignment, result="", error=error
+            )
         except Exception as e:
             logger.debug("(task-manager) Task %s failed: %s", name, e)
             await self._finish_task(
@@ -59,7 +157,65 @@ class TaskManager:
                 name, description, assignment, result=result, error=""
             )
         finally:
-            del self.running_tasks[name]
+            scheduled.finished_at = time.monotonic()
+            self.stats.finished += 1
+            self.stats.total_run_time += scheduled.run_time
+            logger.debug(
+                "(task-manager) Task %s waited %.3fs and ran %.3fs",
+                name,
+                scheduled.wait_time,
+                scheduled.run_time,
+            )
+            self.running_tasks.pop(name, None)
+            self.scheduled.pop(name, None)
+            self._start_pending()
+
+    def _start(self, scheduled: ScheduledTask):
+        scheduled.started_at = time.monotonic()
+        self.stats.started += 1
+        self.stats.total_wait_time += scheduled.wait_time
+        self.stats.max_wait_time = max(self.stats.max_wait_time, scheduled.wait_time)
+        # Queued tasks are started by whichever task finishes first,
+        # so they're explicitly run in the context they were submitted from
+        self.running_tasks[scheduled.name] = scheduled.context.run(
+            asyncio.create_task, self._run_task(scheduled)
+        )
+
+    def _enqueue(self, scheduled: ScheduledTask):
+        teams = self.pending.setdefault(scheduled.priority, OrderedDict())
+        teams.setdefault(scheduled.team, deque()).append(scheduled)
+        self.pending_count += 1
+
+    def _dequeue(self) -> Optional[ScheduledTask]:
+        if not self.pending:
+            return None
+        priority = max(self.pending)
+        teams = self.pending[priority]
+        team, queue = next(iter(teams.items()))
+        scheduled = queue.popleft()
+        if queue:
+            # The team goes to the back of the line
+            teams.move_to_end(team)
+        else:
+            del teams[team]
+        if not teams:
+            del self.pending[priority]
+        self.pending_count -= 1
+        return scheduled
+
+    def _start_pending(self):
+        while len(self.running_tasks) < self.max_concurrency:
+            scheduled = self._dequeue()
+            if scheduled is None:
+                return
+            self._start(scheduled)
+
+    def retry_after(self) -> float:
+        """Rough estimate of the seconds until a queue slot frees up"""
+        average = self.stats.average_run_time or 1.0
+        return max(
+            1.0, math.ceil(average * (1 + self.pending_count / self.max_concurrency))
+        )
 
     def run_task(
         self,
@@ -67,19 +223,93 @@ class TaskManager:
         name: str,
         description: str,
         assignment: TaskAssignment,
+        priority: int = 0,
     ) -> None:
-        if name in self.running_tasks:
+        if self.draining:
+            raise errors.TaskManagerDraining("Task manager is shutting down")
+        if name in self.scheduled:
             raise errors.TaskManagerException(f"Task {name} is already running")
-        self.running_tasks[name] = asyncio.create_task(
-            self._run_task(task_executor, name, description, assignment)
+        scheduled = ScheduledTask(
+            task_executor, name, description, assignment, priority=priority
         )
+        if len(self.running_tasks) < self.max_concurrency:
+            self.scheduled[name] = scheduled
+            self._start(scheduled)
+            return
+        if self.pending_count >= self.max_pending:
+            self.stats.rejected += 1
+            raise errors.TaskQueueFull(
+                f"Task queue is full ({self.pending_count} pending)",
+                queue_depth=self.pending_count,
+                retry_after=self.retry_after(),
+            )
+        self.scheduled[name] = scheduled
+        self._enqueue(scheduled)
 
     def cancel_task(self, task: str) -> None:
-        if task not in self.running_tasks:
+        if task in self.running_tasks:
+            self.running_tasks[task].cancel()
+            return
+        scheduled = self.scheduled.pop(task, None)
+        if scheduled is None:
             raise errors.TaskManagerException(f"Task {task} is not running")
-        self.running_tasks[task].cancel()
+        teams = self.pending[scheduled.priority]
+        teams[scheduled.team].remove(scheduled)
+        if not teams[scheduled.team]:
+            del teams[scheduled.team]
+        if not teams:
+            del self.pending[scheduled.priority]
+        self.pending_count -= 1
+        logger.info("Cancelled task %s", task)
+
+    async def start(self):
+        await self.task_interface.start()
 
     def teardown(self):
+        self.pending = {}
+        self.pending_count = 0
+        self.scheduled = {}
         for task in self.running_tasks.values():
             task.cancel()
         self.running_tasks = {}
+
+    async def drain(self, timeout: float) -> list[str]:
+        """Stop accepting tasks, and give running tasks timeout seconds to finish.
+
+        Tasks that are still running are then cancelled, and those (and any that
+        never started) are reported as failed, so that they can be run again.
+        Returns the names of the reported tasks.
+        """
+        self.draining = True
+        interrupted = []
+        while self.pending:
+            interrupted.append(self._dequeue())
+        if self.running_tasks:
+            await asyncio.wait(list(self.running_tasks.values()), timeout=timeout)
+        running = list(self.running_tasks.items())
+        interrupted.extend(self.scheduled[name] for name, _ in running)
+        for _, task in running:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in running), return_exceptions=True)
+        self.scheduled = {}
+
+        for scheduled in interrupted:
+            await self._finish_task(
+                scheduled.name,
+                scheduled.description,
+                scheduled.assignment,
+                result="",
+                error="Interrupted by agent shutdown",
+            )
+        if interrupted:
+            logger.warning(
+                "Interrupted %d task(s) on shutdown: %s",
+                len(interrupted),
+                ", ".join(scheduled.name for scheduled in interrupted),
+            )
+        return [scheduled.name for scheduled in interrupted]
+
+    async def aclose(self, drain_timeout: float = 0.0):
+        """Drain tasks, then send any pending status updates"""
+        await self.drain(drain_timeout)
+        await self.task_interface.aclose()
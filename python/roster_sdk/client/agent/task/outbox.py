@@ -0,0 +1,109 @@
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# (resource_type, namespace, name)
+OutboxKey = tuple[str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_updates (
+    resource_type TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    name TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (resource_type, namespace, name)
+)
+"""
+
+
+class StatusUpdateOutbox:
+    """Durable record of status updates which have not been acknowledged yet.
+
+    Backed by SQLite, holding only the latest update per resource.
+    All database access happens on a single background thread (in submission
+    order), so the event loop never blocks on disk writes.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        self.path = path
+        self.compact_every = compact_every
+        self._acks_since_compaction = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="roster-outbox"
+        )
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+        return self._db
+
+    def _run(self, func: Callable[..., T], *args) -> "asyncio.Future[T]":
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _append(self, key: OutboxKey, seq: int, event: dict):
+        db = self._connect()
+        db.execute(
+            "INSERT OR REPLACE INTO status_updates VALUES (?, ?, ?, ?, ?)",
+            (*key, seq, json.dumps(event)),
+        )
+        db.commit()
+
+    def _ack(self, entries: list[tuple[OutboxKey, int]]):
+        db = self._connect()
+        # Only remove an entry if it hasn't been replaced by a newer update
+        db.executemany(
+            "DELETE FROM status_updates "
+            "WHERE resource_type = ? AND namespace = ? AND name = ? AND seq <= ?",
+            [(*key, seq) for key, seq in entries],
+        )
+        db.commit()
+        self._acks_since_compaction += len(entries)
+        if self._acks_since_compaction >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        db = self._connect()
+        db.execute("VACUUM")
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._acks_since_compaction = 0
+
+    def _pending(self) -> list[tuple[int, dict]]:
+        rows = self._connect().execute(
+            "SELECT seq, event FROM status_updates ORDER BY seq"
+        )
+        return [(seq, json.loads(event)) for seq, event in rows]
+
+    def _close(self):
+        if self._db is not None:
+            self._compact()
+            self._db.close()
+            self._db = None
+
+    def append(self, key: OutboxKey, seq: int, event: dict) -> asyncio.Future:
+        """Record an update, replacing any older update for the same resource"""
+        return self._run(self._append, key, seq, event)
+
+    async def ack(self, entries: list[tuple[OutboxKey, int]]):
+        """Remove delivered updates (unless they have since been replaced)"""
+        await self._run(self._ack, entries)
+
+    async def pending(self) -> list[tuple[int, dict]]:
+        """Unacknowledged updates as (seq, event), oldest first"""
+        return await self._run(self._pending)
+
+    async def barrier(self):
+        """Wait until every previously submitted write has been persisted"""
+        await self._run(lambda: None)
+
+    async def aclose(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
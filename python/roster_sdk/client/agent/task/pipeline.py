@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from typing import Optional
+
+from roster_sdk.client import errors
+from roster_sdk.client.base import BulkResult, RosterClient
+
+from .outbox import StatusUpdateOutbox
+
+logger = logging.getLogger(__name__)
+
+# Longest wait before retrying after failed flushes
+MAX_FLUSH_BACKOFF = 30.0
+
+StatusUpdateKey = tuple[str, str, str]
+
+
+def _key(event: dict) -> StatusUpdateKey:
+    return event["resource_type"], event["namespace"], event["name"]
+
+
+def _log_outbox_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Failed to record status update: %s", future.exception())
+
+
+class _PendingUpdate:
+    __slots__ = ("event", "seq", "futures")
+
+    def __init__(self, event: dict, seq: int):
+        self.event = event
+        self.seq = seq
+        self.futures: list[asyncio.Future] = []
+
+
+class StatusUpdatePipeline:
+    """Buffers status update events and sends them in batches.
+
+    Repeated updates for the same resource are coalesced (latest wins).
+    A batch is sent once max_batch_size resources are pending,
+    or flush_interval seconds after the first update was buffered.
+
+    With an outbox, every update is recorded on disk before it is sent
+    and removed once acknowledged, and start() replays what is left over
+    from a previous run.
+    """
+
+    def __init__(
+        self,
+        client: RosterClient,
+        max_batch_size: int = 50,
+        flush_interval: float = 0.25,
+        outbox: Optional[StatusUpdateOutbox] = None,
+    ):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.outbox = outbox
+        self._seq = 0
+        self._pending: dict[StatusUpdateKey, _PendingUpdate] = {}
+        self._has_pending: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _ensure_started(self):
+        if self._flush_task is not None:
+            return
+        self._has_pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    def _enqueue(self, event: dict, seq: int, futures: list[asyncio.Future]):
+        key = _key(event)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingUpdate(event, seq)
+        else:
+            # Latest wins, but whoever was waiting on the old event
+            # is satisfied once the newer one has been delivered.
+            pending.event = event
+            pending.seq = seq
+        pending.futures.extend(futures)
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+
+    def submit(self, event: dict) -> asyncio.Future:
+        """Buffer a status update event.
+
+        The returned future resolves once the event (or a newer update for the
+        same resource) has been delivered, and does not need to be awaited.
+        """
+        if self._closed:
+            raise errors.RosterClientException("Status update pipeline is closed.")
+        self._ensure_started()
+        self._seq += 1
+        if self.outbox is not None:
+            self.outbox.append(_key(event), self._seq, event).add_done_callback(
+                _log_outbox_failure
+            )
+        future = asyncio.get_running_loop().create_future()
+        # Failures are logged by flush, and retrieved here so that callers aren't
+        # required to await the future (without "exception never retrieved" noise)
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._enqueue(event, self._seq, [future])
+        return future
+
+    async def start(self):
+        """Start flushing, replaying unacknowledged updates from the outbox"""
+        if self._closed:
+            raise errors.RosterClientException("Status update pipeline is closed.")
+        self._ensure_started()
+        if self.outbox is None:
+            return
+        replayed = await self.outbox.pending()
+        for seq, event in replayed:
+            # Keep sequence numbers increasing across restarts
+            self._seq = max(self._seq, seq)
+            if _key(event) not in self._pending:
+                self._enqueue(event, seq, [])
+        if replayed:
+            logger.info("Replaying %d status updates from outbox", len(replayed))
+
+    async def _flush_periodically(self):
+        failures = 0
+        while True:
+            await self._has_pending.wait()
+            if failures:
+                # Back off while the API keeps failing, rather than
+                # retrying every flush_interval
+                await asyncio.sleep(
+                    min(self.flush_interval * 2**failures, MAX_FLUSH_BACKOFF)
+                )
+            else:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                # Shielded so that closing the pipeline never drops a batch in flight
+                delivered = await asyncio.shield(self.flush())
+            except Exception as e:
+                logger.error("Failed to flush status updates: %s", e)
+                delivered = False
+            failures = 0 if delivered else failures + 1
+
+    async def flush(self, final: bool = False) -> bool:
+        """Send everything that is currently pending.
+
+        Failed updates are requeued unless this is the final flush,
+        in which case their futures receive the error.
+        Returns whether every update was delivered.
+        """
+        if self._flush_lock is None:
+            return True
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            self._has_pending.clear()
+            self._full.clear()
+            if not batch:
+                return True
+
+            updates = list(batch.values())
+            try:
+                if self.outbox is not None:
+                    # Never send anything that hasn't been recorded yet
+                    await self.outbox.barrier()
+                results = await self.client.status_updates(
+                    [update.event for update in updates]
+                )
+            except Exception as e:
+                # e.g. an unexpected response from the API;
+                # the batch has been taken off the queue, so it's requeued below
+                results = [BulkResult(error=e) for _ in updates]
+            if self.outbox is not None:
+                try:
+                    await self.outbox.ack(
+                        [
+                            (_key(update.event), update.seq)
+                            for update, result in zip(updates, results)
+                            if result.ok
+                        ]
+                    )
+                except Exception as e:
+                    # Delivered anyway; they'll just be replayed on restart
+                    logger.error("Failed to acknowledge status updates: %s", e)
+            for update, result in zip(updates, results):
+                if result.ok:
+                    for future in update.futures:
+                        if not future.done():
+                            future.set_result(None)
+                elif final:
+                    logger.error(
+                        "Failed to send status update for %s", update.event["name"]
+                    )
+                    for future in update.futures:
+                        if not future.done():
+                            future.set_exception(result.error)
+                else:
+                    logger.debug(
+                        "(status-updates) Requeueing update for %s: %s",
+                        update.event["name"],
+                        result.error,
+                    )
+                    # A newer update may have been submitted in the meantime
+                    if _key(update.event) in self._pending:
+                        self._pending[_key(update.event)].futures.extend(update.futures)
+                    else:
+                        self._enqueue(update.event, update.seq, update.futures)
+            return all(result.ok for result in results)
+
+    async def aclose(self):
+        """Stop the background flush and deliver anything still pending"""
+        self._closed = True
+        if self._flush_task is None:
+            if self.outbox is not None:
+                await self.outbox.aclose()
+            return
+        self._flush_task.cancel()
+        try:
+            await self._flush_task
+        except asyncio.CancelledError:
+            pass
+        await self.flush(final=True)
+        if self.outbox is not None:
+            # Anything that failed to send stays in the outbox for the next run
+            await self.outbox.aclose()
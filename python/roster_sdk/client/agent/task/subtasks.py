@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from typing import Optional
+
+import pydantic
+from roster_sdk.client import errors
+from roster_sdk.client.base import RosterClient
+from roster_sdk.client.informer import ResourceEventWatcher
+from roster_sdk.models.api.events import ResourceEvent, ResourceEventType
+from roster_sdk.models.resources.task import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses a task doesn't move on from
+FINISHED_STATUSES = frozenset({"success", "error", "unknown"})
+
+
+class TaskCompletionWatcher(ResourceEventWatcher):
+    """Resolves futures for tasks as their final status arrives on the events stream.
+
+    Statuses sent while the stream was down are fetched when it reconnects.
+    A watcher (like its futures) belongs to the event loop it was started on.
+    """
+
+    def __init__(self, client: RosterClient, **kwargs):
+        super().__init__(client, **kwargs)
+        self.waiters: dict[str, asyncio.Future] = {}
+        self.connected = asyncio.Event()
+
+    def wait_for(self, task: str) -> asyncio.Future:
+        """A future for the final status of a task (register before creating it)"""
+        future = self.waiters.get(task)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.waiters[task] = future
+            future.add_done_callback(lambda _: self._forget(task, future))
+        return future
+
+    def _forget(self, task: str, future: asyncio.Future):
+        if self.waiters.get(task) is future:
+            del self.waiters[task]
+
+    def _resolve(self, task: str, status: Optional[dict]):
+        future = self.waiters.get(task)
+        if future is None or future.done() or not status:
+            return
+        if status.get("status") not in FINISHED_STATUSES:
+            return
+        try:
+            future.set_result(TaskStatus(**status))
+        except pydantic.ValidationError as e:
+            future.set_exception(errors.RosterClientException(e.json()))
+
+    def _handle_event(self, event: ResourceEvent):
+        super()._handle_event(event)
+        if event.resource_type != "TASK" or event.name not in self.waiters:
+            return
+        if event.event_type == ResourceEventType.DELETE:
+            future = self.waiters[event.name]
+            if not future.done():
+                future.set_exception(
+                    errors.RosterClientException(f"Task {event.name} was deleted")
+                )
+            return
+        status = event.status
+        if status is None and event.resource is not None:
+            status = event.resource.get("status")
+        self._resolve(event.name, status)
+
+    async def poll(self, task: str) -> Optional[TaskStatus]:
+        """Fetch the status of a task, resolving its future if it has finished"""
+        try:
+            resource = await self.client.task.get(task, use_cache=False)
+        except errors.ResourceNotFound:
+            # Not created yet
+            return None
+        except errors.RosterClientException as e:
+            logger.debug("(subtasks) Failed to fetch task %s: %s", task, e)
+            return None
+        self._resolve(task, resource.status.dict())
+        if resource.status.status not in FINISHED_STATUSES:
+            return None
+        return resource.status
+
+    async def _on_connect(self):
+        self.connected.set()
+        # Catch up on anything that finished while we weren't listening
+        await asyncio.gather(*map(self.poll, list(self.waiters)))
+
+    def _on_disconnect(self):
+        self.connected.clear()
@@ -1,31 +1,182 @@
+import asyncio
+import codecs
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from functools import cached_property
-from typing import Generic, Type, TypeVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
 
 import aiohttp
 import pydantic
 from roster_sdk import config
-from roster_sdk.agent.context import get_agent_activity_context
+from roster_sdk.agent.context import (
+    agent_deadline,
+    get_agent_activity_context,
+    get_remaining_time,
+)
 from roster_sdk.client import errors
-from roster_sdk.constants import EXECUTION_ID_HEADER, EXECUTION_TYPE_HEADER
+from roster_sdk.client.cache import ResourceCache
+from roster_sdk.client.retry import (
+    IDEMPOTENT_METHODS,
+    CircuitBreaker,
+    RetryPolicy,
+    is_server_failure,
+    parse_retry_after,
+)
+from roster_sdk.client.singleflight import SingleFlight
+from roster_sdk.client.store import ResourceStore
+from roster_sdk.constants import (
+    EXECUTION_ID_HEADER,
+    EXECUTION_TYPE_HEADER,
+    TIMEOUT_HEADER,
+)
+from roster_sdk.models.api.chat import ChatStreamChunk
+from roster_sdk.models.api.events import ResourceEvent
 from roster_sdk.models.chat import ChatMessage
 from roster_sdk.models.resources.agent import AgentResource
 from roster_sdk.models.resources.role import RoleResource
 from roster_sdk.models.resources.task import TaskResource
 from roster_sdk.models.resources.team import TeamResource
 from roster_sdk.models.resources.team_layout import TeamLayoutResource
+from roster_sdk.models.trusted import construct_trusted
 
 ResourceType = TypeVar("ResourceType")
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BULK_CONCURRENCY = 16
+DEFAULT_PAGE_SIZE = 100
+MAX_TRACKED_CONVERSATIONS = 1024
+
+_JSON_WHITESPACE = " \t\r\n"
+
+
+@dataclass
+class BulkResult(Generic[T]):
+    """The outcome of one item in a bulk operation"""
+
+    value: Optional[T] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _map_bounded(
+    func: Callable[[Any], Awaitable[T]], items: Sequence, concurrency: int
+) -> "list[BulkResult[T]]":
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def _run(item) -> BulkResult[T]:
+        async with semaphore:
+            try:
+                return BulkResult(value=await func(item))
+            except Exception as e:
+                return BulkResult(error=e)
+
+    # gather preserves input order
+    return list(await asyncio.gather(*map(_run, items)))
+
+
+async def _iter_json_array(
+    content: aiohttp.StreamReader, chunk_size: int = 2**16
+) -> AsyncIterator[Any]:
+    """Incrementally parse a JSON array from a byte stream, yielding its items"""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    async for chunk in content.iter_chunked(chunk_size):
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise errors.RosterClientException("Expected a JSON array.")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Incomplete item, wait for more data
+                break
+            if not isinstance(item, (dict, list, str)):
+                # A number or literal may continue in the next chunk (e.g. "1." then
+                # "5"), so it's only complete once followed by a "," or "]"
+                following = end
+                while following < len(buffer) and buffer[following] in _JSON_WHITESPACE:
+                    following += 1
+                if following == len(buffer) or buffer[following] not in ",]":
+                    break
+            yield item
+            pos = end
+        buffer = buffer[pos:]
+    raise errors.RosterClientException("Unexpected end of JSON array.")
+
+
+async def _iter_sse_data(content: aiohttp.StreamReader) -> AsyncIterator[bytes]:
+    """Yield the data of each (single line) SSE event, or each line of NDJSON"""
+    async for line in content:
+        line = line.strip()
+        if not line or line.startswith(b":"):
+            continue
+        if line.startswith(b"data:"):
+            yield line[len(b"data:") :].strip()
+        elif not line.startswith((b"event:", b"id:", b"retry:")):
+            yield line
 
 
 class CRUDResource(Generic[ResourceType]):
     def __init__(
-        self, client: "RosterClient", endpoint: str, resource_type: Type[ResourceType]
+        self,
+        client: "RosterClient",
+        endpoint: str,
+        resource_type: Type[ResourceType],
+        kind: str,
     ):
         self.client = client
         self.endpoint = endpoint
         self.resource_type = resource_type
+        # Matches the resource_type of resource events (e.g. TEAM)
+        self.kind = kind
+        # When set (e.g. by an Informer), synced reads are served from memory
+        self.store: Optional[ResourceStore[ResourceType]] = None
+        # Unknown until the first create_many
+        self.batch_supported: Optional[bool] = None
 
     def _deserialize(self, data: dict) -> ResourceType:
+        if self.client.trusted:
+            if not isinstance(data, dict):
+                raise errors.RosterClientException(
+                    f"Expected {self.resource_type} but got {data}"
+                )
+            return construct_trusted(self.resource_type, data)
         try:
             return self.resource_type(**data)
         except TypeError:
@@ -36,72 +187,471 @@ class CRUDResource(Generic[ResourceType]):
     async def create(self, data: dict) -> ResourceType:
         return self._deserialize(await self.client.post(self.endpoint, data=data))
 
+    async def _create_batch(
+        self, items: Sequence[dict]
+    ) -> Optional["list[BulkResult[ResourceType]]"]:
+        try:
+            response = await self.client.post(
+                f"{self.endpoint}/batch", data={"items": items}
+            )
+        except (errors.ResourceNotFound, errors.MethodNotAllowed):
+            self.batch_supported = False
+            return None
+        self.batch_supported = True
+
+        if not isinstance(response, list) or len(response) != len(items):
+            raise errors.RosterClientException(
+                f"Expected {len(items)} results from batch create"
+            )
+        results = []
+        for data in response:
+            try:
+                if "error" in data and "spec" not in data:
+                    raise errors.RosterClientException(data["error"])
+                results.append(BulkResult(value=self._deserialize(data)))
+            except Exception as e:
+                results.append(BulkResult(error=e))
+        return results
+
+    async def create_many(
+        self, items: Sequence[dict], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> "list[BulkResult[ResourceType]]":
+        """Create several resources, using the batch endpoint if the API has one.
+
+        Results are in input order, with per-item errors.
+        """
+        if not items:
+            return []
+        if self.batch_supported is not False:
+            results = await self._create_batch(items)
+            if results is not None:
+                return results
+        return await _map_bounded(self.create, items, concurrency)
+
+    async def get_many(
+        self, names: Sequence[str], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> "list[BulkResult[ResourceType]]":
+        return await _map_bounded(self.get, names, concurrency)
+
+    async def delete_many(
+        self, names: Sequence[str], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> "list[BulkResult[None]]":
+        return await _map_bounded(self.delete, names, concurrency)
+
+    async def iter(self) -> AsyncIterator[ResourceType]:
+        """Lazily iterate over all resources as the listing streams in"""
+        if self.store is not None and self.store.synced:
+            for resource in self.store.list():
+                yield resource
+            return
+        async for data in self.client.stream_list(self.endpoint):
+            yield self._deserialize(data)
+
+    async def alist(
+        self, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncIterator["list[ResourceType]"]:
+        """Lazily iterate over all resources in pages of (at most) page_size"""
+        page = []
+        async for resource in self.iter():
+            page.append(resource)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
     async def list(self) -> list[ResourceType]:
+        if self.store is not None and self.store.synced:
+            return self.store.list()
         return list(map(self._deserialize, await self.client.get(self.endpoint)))
 
-    async def get(self, name: str) -> ResourceType:
+    async def get(self, name: str, use_cache: bool = True) -> ResourceType:
         if not name:
             raise errors.RosterClientException("Cannot get resource with empty name.")
-        return self._deserialize(await self.client.get(f"{self.endpoint}/{name}"))
+        if self.store is not None and self.store.synced:
+            resource = self.store.get(name)
+            if resource is not None:
+                return resource
+            # A miss may just mean the store hasn't seen the event yet
+
+        cache = self.client.cache if use_cache else None
+        if cache is None:
+            return self._deserialize(await self.client.get(f"{self.endpoint}/{name}"))
+
+        resource = cache.get(self.kind, name)
+        if resource is not None:
+            return resource
+        version = cache.version
+        resource = self._deserialize(await self.client.get(f"{self.endpoint}/{name}"))
+        cache.put(self.kind, name, resource, version=version)
+        return resource
+
+    def _invalidate(self, name: str):
+        if self.client.cache is not None:
+            self.client.cache.invalidate(self.kind, name)
 
     async def update(self, name: str, data: dict) -> ResourceType:
         if not name:
             raise errors.RosterClientException(
                 "Cannot update resource with empty name."
             )
-        return self._deserialize(
-            await self.client.patch(f"{self.endpoint}/{name}", data=data)
-        )
+        try:
+            return self._deserialize(
+                await self.client.patch(f"{self.endpoint}/{name}", data=data)
+            )
+        finally:
+            self._invalidate(name)
 
     async def delete(self, name: str) -> None:
         if not name:
             raise errors.RosterClientException(
                 "Cannot delete resource with empty name."
             )
-        await self.client.delete(f"{self.endpoint}/{name}")
+        try:
+            await self.client.delete(f"{self.endpoint}/{name}")
+        finally:
+            self._invalidate(name)
 
 
 class RosterClient:
-    def __init__(self, roster_api_url: str):
+    def __init__(
+        self,
+        roster_api_url: str,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        cache: Optional[ResourceCache] = None,
+        coalesce_requests: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_threshold: int = 5,
+        circuit_breaker_reset: float = 30.0,
+        request_timeout: Optional[float] = 30.0,
+        trusted: bool = False,
+    ):
         self.roster_api_url = roster_api_url
+        # Resources from the API are trusted to be valid, and built without validation
+        self.trusted = trusted
+        # Default per-call timeout, cut short by the execution's deadline
+        self.request_timeout = request_timeout
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Circuit breakers are disabled when the threshold is 0
+        self.circuit_breaker_threshold = circuit_breaker_threshold
+        self.circuit_breaker_reset = circuit_breaker_reset
+        self.circuit_breakers: dict[str, CircuitBreaker] = {}
+        # Unknown until the first batch of status updates
+        self.status_update_batch_supported: Optional[bool] = None
+        # How many messages of each conversation the agent remembers
+        self.conversation_lengths: OrderedDict[str, int] = OrderedDict()
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        # The client is shared by task worker threads (each with its own loop),
+        # so the state they share is only changed under this lock
+        self._lock = threading.Lock()
 
     @classmethod
     def from_env(cls) -> "RosterClient":
-        return cls(roster_api_url=config.ROSTER_API_URL)
+        cache = None
+        if config.ROSTER_API_CACHE_SIZE > 0:
+            cache = ResourceCache(
+                max_size=config.ROSTER_API_CACHE_SIZE, ttl=config.ROSTER_API_CACHE_TTL
+            )
+        return cls(
+            roster_api_url=config.ROSTER_API_URL,
+            connection_limit=config.ROSTER_API_CONNECTION_LIMIT,
+            connection_limit_per_host=config.ROSTER_API_CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=config.ROSTER_API_KEEPALIVE_TIMEOUT,
+            dns_cache_ttl=config.ROSTER_API_DNS_CACHE_TTL,
+            cache=cache,
+            retry_policy=RetryPolicy(max_attempts=config.ROSTER_API_RETRY_ATTEMPTS),
+            circuit_breaker_threshold=config.ROSTER_API_CIRCUIT_BREAKER_THRESHOLD,
+            circuit_breaker_reset=config.ROSTER_API_CIRCUIT_BREAKER_RESET,
+            request_timeout=config.ROSTER_API_REQUEST_TIMEOUT,
+            trusted=config.ROSTER_API_TRUSTED,
+        )
+
+    async def __aenter__(self) -> "RosterClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # A session (and its connection pool) is bound to the event loop
+        # it was created on, so each loop (e.g. on task worker threads) has its own.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                # Sessions of loops that have since been closed can't be used again
+                for other in [other for other in self._sessions if other.is_closed()]:
+                    del self._sessions[other]
+                connector = aiohttp.TCPConnector(
+                    limit=self.connection_limit,
+                    limit_per_host=self.connection_limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                )
+                session = aiohttp.ClientSession(connector=connector)
+                self._sessions[loop] = session
+        return session
+
+    async def aclose(self) -> None:
+        """Close the session of the running event loop"""
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
 
-    async def _request(self, method: str, endpoint: str, data: dict = None) -> dict:
-        async with aiohttp.ClientSession() as session:
+    @staticmethod
+    def _headers() -> Optional[dict[str, str]]:
+        activity_context = get_agent_activity_context()
+        if not activity_context:
+            return None
+        _, execution_ctx = activity_context
+        return {
+            EXECUTION_ID_HEADER: execution_ctx.execution_id,
+            EXECUTION_TYPE_HEADER: str(execution_ctx.execution_type),
+        }
+
+    @staticmethod
+    def _budget(timeout: Optional[float]) -> Optional[float]:
+        """What's left of a call's timeout, given the execution's deadline"""
+        remaining = get_remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise errors.DeadlineExceeded()
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @staticmethod
+    def _check_status(response: aiohttp.ClientResponse):
+        if response.status == 404:
+            raise errors.ResourceNotFound()
+        elif response.status == 405:
+            raise errors.MethodNotAllowed()
+        elif response.status != 200:
+            raise errors.UnexpectedStatus(
+                response.status,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[dict],
+        headers: Optional[dict[str, str]],
+        timeout: Optional[float],
+    ) -> dict:
+        budget = self._budget(timeout)
+        if budget is not None:
+            # The callee gets the same budget, including any nested calls it makes
+            headers = {**(headers or {}), TIMEOUT_HEADER: f"{budget:.3f}"}
+        try:
+            async with self.session.request(
+                method=method,
+                url=f"{self.roster_api_url}{endpoint}",
+                json=data,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=budget),
+            ) as response:
+                self._check_status(response)
+                return await response.json()
+        except aiohttp.ClientConnectionError:
+            raise errors.RosterConnectionError()
+        except asyncio.TimeoutError:
+            remaining = get_remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise errors.DeadlineExceeded()
+            raise errors.RequestTimeout()
+
+    def circuit_breaker(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """The circuit breaker for an endpoint's collection (e.g. /teams)"""
+        if self.circuit_breaker_threshold <= 0:
+            return None
+        key = "/" + endpoint.lstrip("/").split("/", 1)[0]
+        with self._lock:
+            breaker = self.circuit_breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    failure_threshold=self.circuit_breaker_threshold,
+                    reset_timeout=self.circuit_breaker_reset,
+                )
+                self.circuit_breakers[key] = breaker
+        return breaker
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[dict],
+        headers: Optional[dict[str, str]],
+        retry: bool,
+        timeout: Optional[float],
+    ) -> dict:
+        breaker = self.circuit_breaker(endpoint)
+        attempt = 0
+        while True:
+            if breaker is not None and not breaker.allow():
+                raise errors.CircuitOpen()
             try:
-                activity_context = get_agent_activity_context()
-                if activity_context:
-                    _, execution_ctx = activity_context
-                    headers = {
-                        EXECUTION_ID_HEADER: execution_ctx.execution_id,
-                        EXECUTION_TYPE_HEADER: str(execution_ctx.execution_type),
-                    }
-                else:
-                    headers = None
-                async with session.request(
-                    method=method,
-                    url=f"{self.roster_api_url}{endpoint}",
-                    json=data,
-                    headers=headers,
-                ) as response:
-                    if response.status == 404:
-                        raise errors.ResourceNotFound()
-                    elif response.status != 200:
-                        raise errors.RosterClientException(
-                            f"Roster API returned {response.status}"
-                        )
-                    return await response.json()
-            except aiohttp.ClientConnectionError:
-                raise errors.RosterConnectionError()
+                result = await self._send(method, endpoint, data, headers, timeout)
+            except errors.DeadlineExceeded:
+                # Says nothing about the health of the API
+                raise
+            except errors.RosterClientException as e:
+                if breaker is not None:
+                    if is_server_failure(e):
+                        breaker.record_failure()
+                    else:
+                        # The API is up, it just didn't like the request
+                        breaker.record_success()
+                if not retry or not self.retry_policy.should_retry(e, attempt):
+                    raise
+                delay = self.retry_policy.delay(
+                    attempt, retry_after=getattr(e, "retry_after", None)
+                )
+                remaining = get_remaining_time()
+                if remaining is not None and delay >= remaining:
+                    # No point in waiting to retry past the deadline
+                    raise
+                logger.debug(
+                    "(client) %s %s failed (%s), retrying in %.2fs",
+                    method,
+                    endpoint,
+                    e,
+                    delay,
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: dict = None,
+        coalesce: Optional[bool] = None,
+        retry: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        headers = self._headers()
+        if timeout is None:
+            timeout = self.request_timeout
+        if coalesce is None:
+            coalesce = method == "GET"
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+
+        def _send():
+            return self._send_with_retries(
+                method, endpoint, data, headers, retry, timeout
+            )
+
+        # Reads are shared across executions, but anything else is only
+        # coalesced within the execution that sent it (and not at all outside one)
+        execution_id = None
+        if method != "GET":
+            execution_id = headers.get(EXECUTION_ID_HEADER) if headers else None
+            coalesce = coalesce and execution_id is not None
+        if not coalesce or self.single_flight is None:
+            return await _send()
+
+        body_hash = (
+            hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).digest()
+            if data is not None
+            else None
+        )
+        # The shared call runs with the first caller's timeout and deadline (and
+        # passes them on to the callee), so it's only shared by callers with the
+        # same ones. Each caller still stops waiting once its own deadline passes.
+        key = (method, endpoint, body_hash, execution_id, timeout, agent_deadline.get())
+        remaining = get_remaining_time()
+        if remaining is None:
+            return await self.single_flight.do(key, _send)
+        if remaining <= 0:
+            raise errors.DeadlineExceeded()
+        try:
+            return await asyncio.wait_for(self.single_flight.do(key, _send), remaining)
+        except asyncio.TimeoutError:
+            raise errors.DeadlineExceeded()
+
+    @asynccontextmanager
+    async def resource_events(self) -> AsyncIterator[AsyncIterator[ResourceEvent]]:
+        """Open the resource events stream.
+
+        The stream is connected once the context is entered,
+        and events are read by iterating over the yielded value.
+        """
+
+        async def _events(response: aiohttp.ClientResponse):
+            async for line in _iter_sse_data(response.content):
+                try:
+                    yield ResourceEvent.parse_raw(line)
+                except pydantic.ValidationError as e:
+                    logger.debug("(client) Skipping malformed resource event: %s", e)
+
+        try:
+            async with self.session.get(
+                f"{self.roster_api_url}{config.ROSTER_API_EVENTS_PATH}",
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=None),
+                read_bufsize=2**20,
+            ) as response:
+                self._check_status(response)
+                yield _events(response)
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError):
+            raise errors.RosterConnectionError()
 
     async def get(self, endpoint: str) -> dict:
         return await self._request("GET", endpoint)
 
-    async def post(self, endpoint: str, data: dict) -> dict:
-        return await self._request("POST", endpoint, data=data)
+    async def stream_list(self, endpoint: str) -> AsyncIterator[Any]:
+        """GET a JSON array, yielding each item as soon as it has been received"""
+        try:
+            # The list can take a while to arrive in full, so the timeout
+            # only applies between chunks (and to the execution's deadline)
+            timeout = aiohttp.ClientTimeout(
+                total=self._budget(None), sock_read=self.request_timeout
+            )
+            async with self.session.get(
+                f"{self.roster_api_url}{endpoint}",
+                headers=self._headers(),
+                timeout=timeout,
+            ) as response:
+                self._check_status(response)
+                async for item in _iter_json_array(response.content):
+                    yield item
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError):
+            raise errors.RosterConnectionError()
+        except asyncio.TimeoutError:
+            raise errors.RequestTimeout()
+
+    async def post(
+        self,
+        endpoint: str,
+        data: dict,
+        coalesce: bool = False,
+        idempotent: bool = False,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        return await self._request(
+            "POST",
+            endpoint,
+            data=data,
+            coalesce=coalesce,
+            retry=idempotent,
+            timeout=timeout,
+        )
 
     async def patch(self, endpoint: str, data: dict) -> dict:
         return await self._request("PATCH", endpoint, data=data)
@@ -110,7 +660,60 @@ class RosterClient:
         await self._request("DELETE", endpoint)
 
     async def status_update(self, data: dict) -> None:
-        await self.post(config.ROSTER_API_STATUS_UPDATE_PATH, data=data)
+        # Status updates are PUT events (latest wins), so they are safe to retry
+        await self.post(
+            config.ROSTER_API_STATUS_UPDATE_PATH, data=data, idempotent=True
+        )
+
+    async def status_updates(
+        self, events: Sequence[dict], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> "list[BulkResult[None]]":
+        """Send several status updates, in one request if the API supports it"""
+        if not events:
+            return []
+        if self.status_update_batch_supported is not False:
+            try:
+                await self.post(
+                    f"{config.ROSTER_API_STATUS_UPDATE_PATH}/batch",
+                    data={"events": list(events)},
+                    idempotent=True,
+                )
+            except (errors.ResourceNotFound, errors.MethodNotAllowed):
+                self.status_update_batch_supported = False
+            except errors.RosterClientException as e:
+                return [BulkResult(error=e) for _ in events]
+            else:
+                self.status_update_batch_supported = True
+                return [BulkResult() for _ in events]
+        return await _map_bounded(self.status_update, events, concurrency)
+
+    async def _chat_prompt_agent(
+        self,
+        role: str,
+        team: str,
+        history: list[ChatMessage],
+        message: ChatMessage,
+        conversation_id: Optional[str],
+        sequence: int,
+    ) -> dict:
+        data = {
+            "team": team,
+            "role": role,
+            "history": [_message.dict() for _message in history[sequence:]],
+            "message": message.dict(),
+        }
+        if conversation_id is not None:
+            data["conversation_id"] = conversation_id
+            data["sequence"] = sequence
+        return await self.post(
+            f"{config.ROSTER_API_COMMANDS_PATH}/agent-chat",
+            data=data,
+            # Identical prompts sent concurrently by the same execution
+            # (e.g. a repeated tool call) only need to be answered once
+            coalesce=True,
+            # Agents take a while to answer
+            timeout=config.ROSTER_API_CHAT_TIMEOUT,
+        )
 
     async def chat_prompt_agent(
         self,
@@ -118,20 +721,83 @@ class RosterClient:
         team: str,
         history: list[ChatMessage],
         message: ChatMessage,
+        conversation_id: Optional[str] = None,
     ) -> ChatMessage:
+        """Prompt an agent on a team.
+
+        With a conversation_id (and an append-only history), only the messages
+        the agent hasn't seen yet are sent. If the agent has forgotten
+        the conversation, the full history is sent again.
+        """
+        sequence = 0
+        if conversation_id is not None:
+            with self._lock:
+                sequence = self.conversation_lengths.pop(conversation_id, 0)
+            if sequence > len(history):
+                sequence = 0
+        try:
+            try:
+                response_data = await self._chat_prompt_agent(
+                    role, team, history, message, conversation_id, sequence
+                )
+            except errors.UnexpectedStatus as e:
+                if e.status != 409 or sequence == 0:
+                    raise
+                response_data = await self._chat_prompt_agent(
+                    role, team, history, message, conversation_id, 0
+                )
+            response = ChatMessage(**response_data)
+        except errors.RosterClientException:
+            raise
+        except pydantic.ValidationError as e:
+            raise errors.RosterClientException(e.json())
+
+        conversation_length = response_data.get("conversation_length")
+        if conversation_id is not None and conversation_length is not None:
+            with self._lock:
+                self.conversation_lengths[conversation_id] = conversation_length
+                while len(self.conversation_lengths) > MAX_TRACKED_CONVERSATIONS:
+                    self.conversation_lengths.popitem(last=False)
+        return response
+
+    async def chat_prompt_agent_stream(
+        self,
+        role: str,
+        team: str,
+        history: list[ChatMessage],
+        message: ChatMessage,
+    ) -> AsyncIterator[str]:
+        """Like chat_prompt_agent, but yields the response as it is generated"""
+        headers = self._headers()
+        budget = self._budget(None)
+        if budget is not None:
+            headers = {**(headers or {}), TIMEOUT_HEADER: f"{budget:.3f}"}
         try:
-            response_data = await self.post(
-                f"{config.ROSTER_API_COMMANDS_PATH}/agent-chat",
-                data={
+            async with self.session.post(
+                f"{self.roster_api_url}{config.ROSTER_API_COMMANDS_PATH}"
+                "/agent-chat/stream",
+                json={
                     "team": team,
                     "role": role,
                     "history": [_message.dict() for _message in history],
                     "message": message.dict(),
                 },
-            )
-            return ChatMessage(**response_data)
-        except errors.RosterClientException:
-            raise
+                headers=headers,
+                # Limits the wait for each token, rather than the whole response
+                timeout=aiohttp.ClientTimeout(
+                    total=budget, sock_read=config.ROSTER_API_CHAT_TIMEOUT
+                ),
+            ) as response:
+                self._check_status(response)
+                async for data in _iter_sse_data(response.content):
+                    chunk = ChatStreamChunk.parse_raw(data)
+                    if chunk.error is not None:
+                        raise errors.RosterClientException(chunk.error)
+                    yield chunk.token
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError):
+            raise errors.RosterConnectionError()
+        except asyncio.TimeoutError:
+            raise errors.RequestTimeout()
         except pydantic.ValidationError as e:
             raise errors.RosterClientException(e.json())
 
@@ -141,6 +807,7 @@ class RosterClient:
             client=self,
             endpoint=config.ROSTER_API_AGENTS_PATH,
             resource_type=AgentResource,
+            kind="AGENT",
         )
 
     @cached_property
@@ -149,6 +816,7 @@ class RosterClient:
             client=self,
             endpoint=config.ROSTER_API_ROLES_PATH,
             resource_type=RoleResource,
+            kind="ROLE",
         )
 
     @cached_property
@@ -157,6 +825,7 @@ class RosterClient:
             client=self,
             endpoint=config.ROSTER_API_TEAMS_PATH,
             resource_type=TeamResource,
+            kind="TEAM",
         )
 
     @cached_property
@@ -165,6 +834,7 @@ class RosterClient:
             client=self,
             endpoint=config.ROSTER_API_TEAM_LAYOUTS_PATH,
             resource_type=TeamLayoutResource,
+            kind="TEAM_LAYOUT",
         )
 
     @cached_property
@@ -173,4 +843,16 @@ class RosterClient:
             client=self,
             endpoint=config.ROSTER_API_TASKS_PATH,
             resource_type=TaskResource,
+            kind="TASK",
         )
+
+
+_roster_client: Optional[RosterClient] = None
+
+
+# honor system singleton
+def get_roster_client() -> RosterClient:
+    global _roster_client
+    if _roster_client is None:
+        _roster_client = RosterClient.from_env()
+    return _roster_client
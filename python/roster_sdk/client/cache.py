@@ -0,0 +1,103 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from roster_sdk.models.api.events import ResourceEvent
+
+CacheKey = tuple[str, str]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResourceCache:
+    """Bounded LRU cache of resources keyed by (kind, name), with per-kind TTLs.
+
+    Kinds match the resource types used in resource events (e.g. TEAM, TASK).
+    Values are copied on the way in and out (like the results SingleFlight hands
+    to followers), so callers are free to mutate what they put or get.
+    It can be shared by clients on several threads (e.g. task worker threads).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 30.0,
+        ttls: Optional[dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.clock = clock
+        self.stats = CacheStats()
+        # Bumped on every invalidation, so that reads which started before
+        # an invalidation don't repopulate the cache with stale data.
+        self.version = 0
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, kind: str, name: str) -> Optional[Any]:
+        key = (kind, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, kind: str, name: str, value: Any, version: Optional[int] = None):
+        ttl = self.ttls.get(kind, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        key = (kind, name)
+        value = copy.deepcopy(value)
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, kind: str, name: str):
+        with self._lock:
+            self.version += 1
+            if self._entries.pop((kind, name), None) is not None:
+                self.stats.invalidations += 1
+
+    def invalidate_event(self, event: ResourceEvent):
+        """Resource event listener (see ResourceEventWatcher.add_listener)"""
+        self.invalidate(event.resource_type, event.name)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self.stats.invalidations += len(self._entries)
+            self._entries.clear()
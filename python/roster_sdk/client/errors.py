@@ -12,6 +12,40 @@ class RosterConnectionError(RosterClientException):
         super().__init__(message, details)
 
 
+class CircuitOpen(RosterConnectionError):
+    """Exception raised when requests are failing fast because the Roster API is down."""
+
+    def __init__(
+        self, message="The Roster API is unavailable, failing fast.", details=None
+    ):
+        super().__init__(message, details)
+
+
+class RequestTimeout(RosterConnectionError):
+    """Exception raised when a request to the Roster API times out."""
+
+    def __init__(
+        self, message="The request to the Roster API timed out.", details=None
+    ):
+        super().__init__(message, details)
+
+
+class DeadlineExceeded(RosterClientException):
+    """Exception raised when the execution's deadline has passed."""
+
+    def __init__(self, message="The execution's deadline has passed.", details=None):
+        super().__init__(message, details)
+
+
+class UnexpectedStatus(RosterClientException):
+    """Exception raised when the Roster API responds with an unexpected status."""
+
+    def __init__(self, status: int, retry_after=None, details=None):
+        super().__init__(f"Roster API returned {status}", details)
+        self.status = status
+        self.retry_after = retry_after
+
+
 class ResourceNotFound(RosterClientException):
     """Exception raised when a resource is not found."""
 
@@ -19,6 +53,25 @@ class ResourceNotFound(RosterClientException):
         super().__init__(message, details)
 
 
+class MethodNotAllowed(RosterClientException):
+    """Exception raised when the Roster API does not support the requested method."""
+
+    def __init__(self, message="The requested method is not allowed.", details=None):
+        super().__init__(message, details)
+
+
+class SubtaskFailed(RosterClientException):
+    """Exception raised when a subtask finishes without succeeding."""
+
+    def __init__(self, task: str, status, details=None):
+        super().__init__(
+            f"Subtask {task} finished with status {status.status}: {status.error}",
+            details,
+        )
+        self.task = task
+        self.status = status
+
+
 class TeamMemberNotFound(RosterClientException):
     """Exception raised when a team member is not found."""
 
@@ -42,3 +95,16 @@ class TaskManagerException(Exception):
 
     def __init__(self, message):
         self.message = message
+
+
+class TaskQueueFull(TaskManagerException):
+    """Raised when every worker is busy and the pending queue is full"""
+
+    def __init__(self, message, queue_depth: int, retry_after: float):
+        super().__init__(message)
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class TaskManagerDraining(TaskManagerException):
+    """Raised when tasks are submitted while the task manager shuts down"""
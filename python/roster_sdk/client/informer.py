@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import random
+from typing import Callable, Generic, Optional
+
+import pydantic
+from roster_sdk.client import errors
+from roster_sdk.client.base import CRUDResource, ResourceType, RosterClient
+from roster_sdk.client.cache import ResourceCache
+from roster_sdk.client.store import Indexer, ResourceStore
+from roster_sdk.models.api.events import ResourceEvent, ResourceEventType
+from roster_sdk.models.resources.task import TaskResource
+
+logger = logging.getLogger(__name__)
+
+EventListener = Callable[[ResourceEvent], None]
+
+TASKS_BY_AGENT = "agent"
+TASKS_BY_PARENT = "parent"
+
+# Metadata key of a resource's (integer) version, when the API sets it
+RESOURCE_VERSION = "resource_version"
+
+
+def _version(resource) -> Optional[int]:
+    try:
+        return int(resource.metadata[RESOURCE_VERSION])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _is_older(resource, than) -> bool:
+    """Whether resource is known to be an older version than than"""
+    version, other = _version(resource), _version(than)
+    return version is not None and other is not None and version < other
+
+
+def _task_agent(task: TaskResource) -> list[str]:
+    if task.status.assignment is None:
+        return []
+    return [task.status.assignment.agent_name]
+
+
+def _task_parent(task: TaskResource) -> list[str]:
+    if task.spec.parent is None:
+        return []
+    return [task.spec.parent.name]
+
+
+class ResourceInformer(Generic[ResourceType]):
+    def __init__(
+        self,
+        resource: CRUDResource[ResourceType],
+        indexers: Optional[dict[str, Indexer]] = None,
+    ):
+        self.resource = resource
+        self.store: ResourceStore[ResourceType] = ResourceStore(indexers=indexers)
+        # Resources changed by events while a relist is in flight (None if deleted)
+        self._relist_changes: Optional[dict[str, Optional[ResourceType]]] = None
+
+    async def resync(self):
+        changes = self._relist_changes = {}
+        try:
+            # Always list from the API, never from our own store
+            data = await self.resource.client.get(self.resource.endpoint)
+        finally:
+            self._relist_changes = None
+
+        resources = {}
+        for item in data:
+            try:
+                resource = self.resource._deserialize(item)
+                resources[resource.spec.name] = resource
+            except Exception as e:
+                logger.warning(
+                    "(informer) Skipping invalid %s in listing: %s",
+                    self.resource.kind,
+                    e,
+                )
+        # The listing may be older than events that arrived while it was in flight,
+        # so those win, unless the listing has a newer version
+        for name, resource in changes.items():
+            if resource is None:
+                resources.pop(name, None)
+            elif name not in resources or not _is_older(resource, resources[name]):
+                resources[name] = resource
+        self.store.replace(resources)
+
+    def _record_change(self, name: str, resource: Optional[ResourceType]):
+        if self._relist_changes is not None:
+            self._relist_changes[name] = resource
+
+    def apply(self, event: ResourceEvent):
+        if event.event_type == ResourceEventType.DELETE:
+            self.store.delete(event.name)
+            self._record_change(event.name, None)
+            return
+
+        if event.resource is not None:
+            data = event.resource
+        else:
+            # Partial update, merge onto the resource we already know about
+            current = self.store.get(event.name)
+            if current is None:
+                logger.debug(
+                    "(informer) Ignoring partial update for unknown %s %s",
+                    event.resource_type,
+                    event.name,
+                )
+                return
+            data = current.dict()
+            if event.spec is not None:
+                data["spec"] = event.spec
+            if event.status is not None:
+                data["status"] = event.status
+
+        try:
+            resource = self.resource._deserialize(data)
+        except (errors.RosterClientException, pydantic.ValidationError) as e:
+            logger.debug(
+                "(informer) Failed to apply event for %s %s: %s",
+                event.resource_type,
+                event.name,
+                e,
+            )
+            return
+        current = self.store.get(event.name)
+        if current is not None and _is_older(resource, current):
+            logger.debug(
+                "(informer) Ignoring stale event for %s %s",
+                event.resource_type,
+                event.name,
+            )
+            return
+        self.store.put(event.name, resource)
+        self._record_change(event.name, resource)
+
+
+class ResourceEventWatcher:
+    """Consumes the resource events stream, reconnecting with backoff when it drops.
+
+    Subclasses can hook into (re)connection via _on_connect and _on_disconnect.
+    """
+
+    def __init__(
+        self,
+        client: RosterClient,
+        min_reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        self.client = client
+        self.min_reconnect_delay = min_reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.listeners: list[EventListener] = []
+        self._watch_task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: EventListener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: EventListener):
+        self.listeners.remove(listener)
+
+    def _notify_listeners(self, event: ResourceEvent):
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.debug("(informer) Event listener failed: %s", e)
+
+    def _handle_event(self, event: ResourceEvent):
+        self._notify_listeners(event)
+
+    async def _on_connect(self):
+        pass
+
+    def _on_disconnect(self):
+        pass
+
+    async def _watch(self):
+        delay = self.min_reconnect_delay
+        while True:
+            try:
+                async with self.client.resource_events() as events:
+                    await self._on_connect()
+                    delay = self.min_reconnect_delay
+                    async for event in events:
+                        self._handle_event(event)
+                logger.info("(informer) Resource events stream closed")
+            except errors.RosterClientException as e:
+                logger.warning("(informer) Resource events stream failed: %s", e)
+            except Exception:
+                # Never stop watching, e.g. because of an unexpected response
+                logger.exception("(informer) Unexpected error watching resource events")
+            finally:
+                self._on_disconnect()
+
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self):
+        if self._watch_task is not None:
+            return
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task is None:
+            return
+        self._watch_task.cancel()
+        try:
+            await self._watch_task
+        except asyncio.CancelledError:
+            pass
+        self._watch_task = None
+
+
+class RosterInformer(ResourceEventWatcher):
+    """Keeps local copies of Roster resources up to date using the events stream.
+
+    While the events stream is connected, reads through the client's CRUDResources
+    are served from memory. If the stream drops, reads fall back to the API until
+    the informer has reconnected and relisted every resource kind.
+    """
+
+    def __init__(
+        self,
+        client: RosterClient,
+        resync_interval: float = 300.0,
+        min_reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        super().__init__(
+            client,
+            min_reconnect_delay=min_reconnect_delay,
+            max_reconnect_delay=max_reconnect_delay,
+        )
+        self.resync_interval = resync_interval
+        self.informers: dict[str, ResourceInformer] = {
+            informer.resource.kind: informer
+            for informer in [
+                ResourceInformer(client.agent),
+                ResourceInformer(client.role),
+                ResourceInformer(client.team),
+                ResourceInformer(client.team_layout),
+                ResourceInformer(
+                    client.task,
+                    indexers={
+                        TASKS_BY_AGENT: _task_agent,
+                        TASKS_BY_PARENT: _task_parent,
+                    },
+                ),
+            ]
+        }
+        self._synced: Optional[asyncio.Event] = None
+        self._resync_task: Optional[asyncio.Task] = None
+
+    def store(self, resource_type: str) -> ResourceStore:
+        return self.informers[resource_type].store
+
+    @property
+    def synced(self) -> bool:
+        return all(informer.store.synced for informer in self.informers.values())
+
+    def _handle_event(self, event: ResourceEvent):
+        informer = self.informers.get(event.resource_type)
+        if informer is not None:
+            informer.apply(event)
+        super()._handle_event(event)
+
+    async def resync(self):
+        await asyncio.gather(
+            *(informer.resync() for informer in self.informers.values())
+        )
+
+    async def _resync_periodically(self):
+        # The first relist happens straight away, and failed ones are retried
+        # with backoff (rather than after resync_interval)
+        failures = 0
+        delay = 0.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.resync()
+            except Exception as e:
+                failures += 1
+                delay = min(
+                    self.min_reconnect_delay * 2 ** (failures - 1),
+                    self.max_reconnect_delay,
+                )
+                logger.warning("(informer) Resync failed: %s", e)
+                continue
+            failures = 0
+            delay = self.resync_interval
+            self._synced.set()
+
+    async def _on_connect(self):
+        # Relist after connecting, while events are already being applied,
+        # so that no events are missed in between
+        self._resync_task = asyncio.create_task(self._resync_periodically())
+
+    def _on_disconnect(self):
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+            self._resync_task = None
+        for informer in self.informers.values():
+            informer.store.synced = False
+        self._synced.clear()
+
+    def start(self):
+        if self._watch_task is not None:
+            return
+        self._synced = asyncio.Event()
+        for informer in self.informers.values():
+            informer.resource.store = informer.store
+        super().start()
+
+    async def wait_for_sync(self, timeout: Optional[float] = None):
+        if self._synced is None:
+            raise errors.RosterClientException("Informer has not been started.")
+        await asyncio.wait_for(self._synced.wait(), timeout)
+
+    async def stop(self):
+        await super().stop()
+        for informer in self.informers.values():
+            informer.resource.store = None
+
+
+class CacheInvalidator(ResourceEventWatcher):
+    """Invalidates entries in a ResourceCache as resource events arrive."""
+
+    def __init__(
+        self,
+        client: RosterClient,
+        cache: Optional[ResourceCache] = None,
+        min_reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        super().__init__(
+            client,
+            min_reconnect_delay=min_reconnect_delay,
+            max_reconnect_delay=max_reconnect_delay,
+        )
+        self.cache = cache or client.cache
+        if self.cache is None:
+            raise errors.RosterClientException("No cache to invalidate.")
+
+    def _handle_event(self, event: ResourceEvent):
+        self.cache.invalidate_event(event)
+        super()._handle_event(event)
+
+    async def _on_connect(self):
+        # Events may have been missed while disconnected
+        self.cache.clear()
@@ -0,0 +1,114 @@
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Callable, Optional
+
+from roster_sdk.client import errors
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delay in seconds, or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_server_failure(error: errors.RosterClientException) -> bool:
+    """Whether an error means the Roster API itself is unavailable or failing"""
+    if isinstance(error, errors.RosterConnectionError):
+        return True
+    return isinstance(error, errors.UnexpectedStatus) and error.status >= 500
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    initial_backoff: float = 0.2
+    max_backoff: float = 10.0
+    multiplier: float = 2.0
+    # Longer Retry-After values are not worth waiting for
+    max_retry_after: float = 30.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+
+    def should_retry(self, error: errors.RosterClientException, attempt: int) -> bool:
+        if attempt + 1 >= self.max_attempts:
+            return False
+        if isinstance(error, errors.CircuitOpen):
+            return False
+        if isinstance(error, errors.RosterConnectionError):
+            return True
+        return (
+            isinstance(error, errors.UnexpectedStatus)
+            and error.status in self.retry_statuses
+            and (error.retry_after is None or error.retry_after <= self.max_retry_after)
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return retry_after
+        # "Full jitter" exponential backoff
+        ceiling = min(self.max_backoff, self.initial_backoff * self.multiplier**attempt)
+        return random.uniform(0, ceiling)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures, then lets a single probe through
+    once reset_timeout has passed to find out if the API has recovered."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.CLOSED:
+            return True
+        now = self.clock()
+        if self.state == CircuitState.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+        elif now - self._probe_started_at < self.reset_timeout:
+            # A probe is already in flight (or was abandoned recently)
+            return False
+        self._probe_started_at = now
+        return True
+
+    def record_success(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self._opened_at = self.clock()
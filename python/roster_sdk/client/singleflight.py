@@ -0,0 +1,56 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into a single in-flight call.
+
+    The call runs in its own task, so cancelling one caller doesn't affect
+    the others. The call itself is only cancelled once every caller has gone.
+    Callers other than the first receive a deep copy of the result,
+    so they are free to mutate what they get back.
+    Calls are only shared between callers on the same event loop.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        key = (asyncio.get_running_loop(), key)
+        call = self._calls.get(key)
+        leader = call is None
+        if leader:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            result = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Forgotten right away, so that new callers start a fresh call
+                # rather than joining one that is being cancelled
+                self._forget(key, call)
+                call.task.cancel()
+        return result if leader else copy.deepcopy(result)
@@ -0,0 +1,74 @@
+from typing import Callable, Generic, Optional, TypeVar
+
+ResourceType = TypeVar("ResourceType")
+
+# An Indexer maps a resource to the keys it should be found under in an index
+Indexer = Callable[[ResourceType], list[str]]
+
+
+class ResourceStore(Generic[ResourceType]):
+    """In-memory store of resources keyed by name, with optional secondary indexes.
+
+    Resources returned from the store are shared, and should be treated as read-only.
+    """
+
+    def __init__(self, indexers: Optional[dict[str, Indexer]] = None):
+        self.indexers: dict[str, Indexer] = dict(indexers or {})
+        self.synced = False
+        self._items: dict[str, ResourceType] = {}
+        self._indices: dict[str, dict[str, set[str]]] = {
+            index: {} for index in self.indexers
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._items
+
+    def get(self, name: str) -> Optional[ResourceType]:
+        return self._items.get(name)
+
+    def by_index(self, index: str, key: str) -> list[ResourceType]:
+        names = self._indices[index].get(key, ())
+        return [self._items[name] for name in names]
+
+    def _index(self, name: str, resource: ResourceType):
+        for index, indexer in self.indexers.items():
+            for key in indexer(resource):
+                self._indices[index].setdefault(key, set()).add(name)
+
+    def _unindex(self, name: str, resource: ResourceType):
+        for index, indexer in self.indexers.items():
+            keys = self._indices[index]
+            for key in indexer(resource):
+                names = keys.get(key)
+                if names is None:
+                    continue
+                names.discard(name)
+                if not names:
+                    del keys[key]
+
+    def put(self, name: str, resource: ResourceType):
+        previous = self._items.get(name)
+        if previous is not None:
+            self._unindex(name, previous)
+        self._items[name] = resource
+        self._index(name, resource)
+
+    def delete(self, name: str) -> Optional[ResourceType]:
+        resource = self._items.pop(name, None)
+        if resource is not None:
+            self._unindex(name, resource)
+        return resource
+
+    def replace(self, resources: dict[str, ResourceType]):
+        self._items = {}
+        self._indices = {index: {} for index in self.indexers}
+        for name, resource in resources.items():
+            self.put(name, resource)
+        self.synced = True
+
+    def list(self) -> list[ResourceType]:
+        # Defined last so that it doesn't shadow the builtin in annotations above
+        return list(self._items.values())
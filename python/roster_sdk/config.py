@@ -23,6 +23,52 @@ ROSTER_API_STATUS_UPDATE_PATH = env.str(
     "ROSTER_API_STATUS_UPDATE_PATH", "/status-update"
 )
 
+# Roster API Client Config
+ROSTER_API_CONNECTION_LIMIT = env.int("ROSTER_API_CONNECTION_LIMIT", 100)
+ROSTER_API_CONNECTION_LIMIT_PER_HOST = env.int(
+    "ROSTER_API_CONNECTION_LIMIT_PER_HOST", 0
+)
+ROSTER_API_KEEPALIVE_TIMEOUT = env.float("ROSTER_API_KEEPALIVE_TIMEOUT", 30.0)
+ROSTER_API_DNS_CACHE_TTL = env.int("ROSTER_API_DNS_CACHE_TTL", 300)
+# Per-call timeouts (further limited by the execution's deadline, if any)
+ROSTER_API_REQUEST_TIMEOUT = env.float("ROSTER_API_REQUEST_TIMEOUT", 30.0)
+ROSTER_API_CHAT_TIMEOUT = env.float("ROSTER_API_CHAT_TIMEOUT", 300.0)
+# Retries for idempotent requests, and per-endpoint circuit breakers
+ROSTER_API_RETRY_ATTEMPTS = env.int("ROSTER_API_RETRY_ATTEMPTS", 3)
+ROSTER_API_CIRCUIT_BREAKER_THRESHOLD = env.int(
+    "ROSTER_API_CIRCUIT_BREAKER_THRESHOLD", 5
+)
+ROSTER_API_CIRCUIT_BREAKER_RESET = env.float("ROSTER_API_CIRCUIT_BREAKER_RESET", 30.0)
+# Skip validating resources from the API (faster, for large listings)
+ROSTER_API_TRUSTED = env.bool("ROSTER_API_TRUSTED", False)
+# Read-through resource cache (disabled when size is 0)
+ROSTER_API_CACHE_SIZE = env.int("ROSTER_API_CACHE_SIZE", 0)
+ROSTER_API_CACHE_TTL = env.float("ROSTER_API_CACHE_TTL", 30.0)
+
+# Batched status updates, sent in the background (disabled when batch size is 0:
+# updates are then sent one at a time, and finish_task waits for delivery)
+ROSTER_STATUS_UPDATE_BATCH_SIZE = env.int("ROSTER_STATUS_UPDATE_BATCH_SIZE", 0)
+ROSTER_STATUS_UPDATE_FLUSH_INTERVAL = env.float(
+    "ROSTER_STATUS_UPDATE_FLUSH_INTERVAL", 0.25
+)
+# (optional) SQLite file recording status updates until they are acknowledged
+ROSTER_STATUS_UPDATE_OUTBOX = env.str("ROSTER_STATUS_UPDATE_OUTBOX", "")
+
+# Seconds subtasks wait for the resource events stream, after which
+# (and while it is down) their status is polled every poll interval
+ROSTER_SUBTASK_CONNECT_TIMEOUT = env.float("ROSTER_SUBTASK_CONNECT_TIMEOUT", 10.0)
+ROSTER_SUBTASK_POLL_INTERVAL = env.float("ROSTER_SUBTASK_POLL_INTERVAL", 5.0)
+
+# Seconds before an agent's view of its team is refreshed
+ROSTER_TEAM_SNAPSHOT_TTL = env.float("ROSTER_TEAM_SNAPSHOT_TTL", 30.0)
+
+# Tool sets (and agents) cached by the LangChain adapter
+ROSTER_LANGCHAIN_CACHE_SIZE = env.int("ROSTER_LANGCHAIN_CACHE_SIZE", 128)
+
+# Tasks run at once by an agent, and tasks waiting for a worker
+ROSTER_AGENT_MAX_CONCURRENT_TASKS = env.int("ROSTER_AGENT_MAX_CONCURRENT_TASKS", 8)
+ROSTER_AGENT_MAX_PENDING_TASKS = env.int("ROSTER_AGENT_MAX_PENDING_TASKS", 100)
+
 
 @dataclass
 class AgentConfig:
@@ -31,6 +77,32 @@ class AgentConfig:
     roster_agent_port: Optional[int] = None
     DEFAULT_LOG_FILE = "/var/log/roster-agent.log"
     roster_agent_log_file: str = DEFAULT_LOG_FILE
+    # File log level, "text" or "json" (lines) format, and gzipped rotation
+    roster_agent_log_level: str = "DEBUG"
+    roster_agent_log_format: str = "text"
+    roster_agent_log_max_bytes: int = 10 * 1024 * 1024
+    roster_agent_log_backup_count: int = 5
+    # Per-subscriber buffering for the activity stream
+    activity_stream_buffer_size: int = 1000
+    activity_stream_slow_consumer_policy: str = "drop_oldest"
+    activity_stream_heartbeat: float = 15.0
+    # (optional) directory persisting activity events for replay
+    activity_log_dir: Optional[str] = None
+    activity_log_segment_bytes: int = 8 * 1024 * 1024
+    activity_log_max_bytes: int = 256 * 1024 * 1024
+    # "async" (on the event loop) or "thread" (on a pool of task_workers threads)
+    task_execution_mode: str = "async"
+    task_workers: int = 4
+    # Processes for BaseRosterAgent.run_in_process (0 is one per CPU)
+    process_workers: int = 0
+    # Seconds given to open connections, then running tasks, on shutdown
+    shutdown_drain_timeout: float = 30.0
+    # Default deadlines, in seconds (0 for none), unless callers send an earlier one
+    chat_timeout: float = 300.0
+    task_timeout: float = 0.0
+    # Conversation histories remembered for callers sending a conversation_id
+    conversation_cache_size: int = 1000
+    conversation_idle_timeout: float = 1800.0
 
     @classmethod
     def from_env(cls):
@@ -44,6 +116,44 @@ class AgentConfig:
             roster_agent_log_file=os.getenv(
                 "ROSTER_AGENT_LOG_FILE", cls.DEFAULT_LOG_FILE
             ),
+            roster_agent_log_level=os.getenv("ROSTER_AGENT_LOG_LEVEL", "DEBUG").upper(),
+            roster_agent_log_format=os.getenv("ROSTER_AGENT_LOG_FORMAT", "text"),
+            roster_agent_log_max_bytes=int(
+                os.getenv("ROSTER_AGENT_LOG_MAX_BYTES", str(10 * 1024 * 1024))
+            ),
+            roster_agent_log_backup_count=int(
+                os.getenv("ROSTER_AGENT_LOG_BACKUP_COUNT", "5")
+            ),
+            activity_stream_buffer_size=int(
+                os.getenv("ROSTER_ACTIVITY_STREAM_BUFFER_SIZE", "1000")
+            ),
+            activity_stream_slow_consumer_policy=os.getenv(
+                "ROSTER_ACTIVITY_STREAM_SLOW_CONSUMER_POLICY", "drop_oldest"
+            ),
+            activity_stream_heartbeat=float(
+                os.getenv("ROSTER_ACTIVITY_STREAM_HEARTBEAT", "15.0")
+            ),
+            activity_log_dir=os.getenv("ROSTER_ACTIVITY_LOG_DIR") or None,
+            activity_log_segment_bytes=int(
+                os.getenv("ROSTER_ACTIVITY_LOG_SEGMENT_BYTES", str(8 * 1024 * 1024))
+            ),
+            activity_log_max_bytes=int(
+                os.getenv("ROSTER_ACTIVITY_LOG_MAX_BYTES", str(256 * 1024 * 1024))
+            ),
+            task_execution_mode=os.getenv("ROSTER_AGENT_TASK_EXECUTION_MODE", "async"),
+            task_workers=int(os.getenv("ROSTER_AGENT_TASK_WORKERS", "4")),
+            process_workers=int(os.getenv("ROSTER_AGENT_PROCESS_WORKERS", "0")),
+            shutdown_drain_timeout=float(
+                os.getenv("ROSTER_AGENT_SHUTDOWN_DRAIN_TIMEOUT", "30.0")
+            ),
+            chat_timeout=float(os.getenv("ROSTER_AGENT_CHAT_TIMEOUT", "300.0")),
+            task_timeout=float(os.getenv("ROSTER_AGENT_TASK_TIMEOUT", "0.0")),
+            conversation_cache_size=int(
+                os.getenv("ROSTER_AGENT_CONVERSATION_CACHE_SIZE", "1000")
+            ),
+            conversation_idle_timeout=float(
+                os.getenv("ROSTER_AGENT_CONVERSATION_IDLE_TIMEOUT", "1800.0")
+            ),
         )
 
     @property
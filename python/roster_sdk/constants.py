@@ -3,3 +3,8 @@ AGENT_LOGGER_NAME = "roster-agent"
 
 EXECUTION_ID_HEADER = "X-Roster-Execution-ID"
 EXECUTION_TYPE_HEADER = "X-Roster-Execution-Type"
+# Seconds left until the caller's deadline
+# (relative, so that clocks don't need to agree)
+TIMEOUT_HEADER = "X-Roster-Timeout"
+# Sent with a 409 when the agent doesn't remember a conversation
+CONVERSATION_LENGTH_HEADER = "X-Roster-Conversation-Length"
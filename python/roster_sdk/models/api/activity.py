@@ -1,7 +1,12 @@
+import copy
 import json
+from abc import ABC, abstractmethod
 from enum import Enum
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field
+from pydantic.json import pydantic_encoder
+from roster_sdk.serialization import dumps
 
 
 class ExecutionType(Enum):
@@ -71,5 +76,144 @@ class ActivityEvent(BaseModel):
             }
         }
 
+    def to_dict(self) -> dict:
+        return _activity_dict(self)
+
+    def serialize(self) -> bytes:
+        return dumps(self.to_dict())
+
+
+def _activity_dict(event) -> dict:
+    # Built by hand since this is on the hot path, and much cheaper than .dict()
+    return {
+        "execution_id": event.execution_id,
+        "execution_type": event.execution_type.value,
+        "type": event.type.value,
+        "content": event.content,
+        "agent_context": {
+            "identity": event.agent_context.identity,
+            "team": event.agent_context.team,
+            "role": event.agent_context.role,
+        },
+    }
+
+
+# Lightweight (unvalidated) counterparts of the models above, used on the hot path:
+# activity context is set for every request, and chatty agents send many events.
+# They are converted to the models only where needed, e.g. when returned by the API.
+
+
+class _ModelRecord(ABC):
+    """The read-only model API (dict, json, copy, ==) for records, so that code
+    written against the models (e.g. reading agent_context) keeps working.
+
+    Built from the record's own slots (which match the model's fields, and its
+    constructor's arguments). Only the less common options of dict, json and
+    copy (e.g. include and exclude) go through the model.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def to_model(self) -> BaseModel:
+        """The model this is a record of"""
+
+    def _values(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def dict(self, **kwargs) -> dict:
+        if kwargs:
+            return self.to_model().dict(**kwargs)
+        return {
+            name: value.dict() if isinstance(value, _ModelRecord) else value
+            for name, value in self._values().items()
+        }
+
+    def json(self, **kwargs) -> str:
+        if kwargs:
+            return self.to_model().json(**kwargs)
+        # What BaseModel.json does with the same data
+        return json.dumps(self.dict(), default=pydantic_encoder)
+
+    def copy(
+        self, *, update: Optional[dict] = None, deep: bool = False, **kwargs
+    ) -> Any:
+        if kwargs:
+            return self.to_model().copy(update=update, deep=deep, **kwargs)
+        record = type(self)(**{**self._values(), **(update or {})})
+        return copy.deepcopy(record) if deep else record
+
+    def __eq__(self, other) -> bool:
+        if type(other) is type(self):
+            return all(
+                getattr(self, name) == getattr(other, name) for name in self.__slots__
+            )
+        if isinstance(other, (_ModelRecord, BaseModel)):
+            other = other.dict()
+        return self.dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{name}={value!r}" for name, value in self._values().items()
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class AgentContextRecord(_ModelRecord):
+    __slots__ = ("identity", "team", "role")
+
+    def __init__(self, identity: str = "", team: str = "", role: str = ""):
+        self.identity = identity
+        self.team = team
+        self.role = role
+
+    def to_model(self) -> AgentContext:
+        return AgentContext(identity=self.identity, team=self.team, role=self.role)
+
+
+class ExecutionContextRecord(_ModelRecord):
+    __slots__ = ("execution_id", "execution_type")
+
+    def __init__(self, execution_id: str, execution_type: ExecutionType):
+        self.execution_id = execution_id
+        self.execution_type = execution_type
+
+    def to_model(self) -> ExecutionContext:
+        return ExecutionContext(
+            execution_id=self.execution_id, execution_type=self.execution_type
+        )
+
+
+class ActivityRecord(_ModelRecord):
+    __slots__ = ("execution_id", "execution_type", "type", "content", "agent_context")
+
+    def __init__(
+        self,
+        execution_id: str,
+        execution_type: ExecutionType,
+        type: ActivityType,
+        content: str,
+        agent_context: AgentContextRecord,
+    ):
+        self.execution_id = execution_id
+        self.execution_type = execution_type
+        self.type = type
+        self.content = content
+        self.agent_context = agent_context
+
+    def to_model(self) -> ActivityEvent:
+        return ActivityEvent(
+            execution_id=self.execution_id,
+            execution_type=self.execution_type,
+            type=self.type,
+            content=self.content,
+            agent_context=self.agent_context.to_model(),
+        )
+
+    def to_dict(self) -> dict:
+        return _activity_dict(self)
+
     def serialize(self) -> bytes:
-        return json.dumps(self.json()).encode("utf-8")
+        return dumps(self.to_dict())
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 from ..chat import ChatMessage
@@ -7,7 +9,19 @@ class ChatArgs(BaseModel):
     identity: str = Field(description="The name of the agent.")
     team: str = Field(description="The name of the team which the agent is on.")
     role: str = Field(description="The role which identifies the agent on the team.")
-    messages: list[ChatMessage] = Field(description="The history of the conversation.")
+    messages: list[ChatMessage] = Field(
+        description="The history of the conversation "
+        "(only the messages from sequence on, when a conversation_id is given)."
+    )
+    conversation_id: Optional[str] = Field(
+        default=None,
+        description="(optional) Identifies a conversation whose history "
+        "the agent remembers between turns.",
+    )
+    sequence: int = Field(
+        default=0,
+        description="The position of the first message within the conversation.",
+    )
 
     class Config:
         validate_assignment = True
@@ -23,7 +37,23 @@ class ChatArgs(BaseModel):
 
 class ChatResponse(BaseModel):
     message: str = Field(description="The text of the agent's response.")
+    conversation_length: Optional[int] = Field(
+        default=None,
+        description="(optional) The number of messages the agent remembers, "
+        "including its response, i.e. the sequence of the next message.",
+    )
 
     class Config:
         validate_assignment = True
         schema_extra = {"example": {"message": "Hello, world!"}}
+
+
+class ChatStreamChunk(BaseModel):
+    token: str = Field(default="", description="The next piece of the response.")
+    error: Optional[str] = Field(
+        default=None, description="(optional) Why the response was cut short."
+    )
+
+    class Config:
+        validate_assignment = True
+        schema_extra = {"example": {"token": "Hello"}}
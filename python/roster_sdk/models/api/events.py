@@ -0,0 +1,39 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ResourceEventType(Enum):
+    PUT = "PUT"
+    DELETE = "DELETE"
+
+
+class ResourceEvent(BaseModel):
+    event_type: ResourceEventType = Field(description="The type of the event.")
+    resource_type: str = Field(description="The type of resource (e.g. TASK).")
+    namespace: str = Field(
+        default="default", description="The namespace of the resource."
+    )
+    name: str = Field(description="The name of the resource.")
+    resource: Optional[dict] = Field(
+        default=None, description="(optional) The full resource after a PUT."
+    )
+    spec: Optional[dict] = Field(
+        default=None, description="(optional) The updated spec of the resource."
+    )
+    status: Optional[dict] = Field(
+        default=None, description="(optional) The updated status of the resource."
+    )
+
+    class Config:
+        validate_assignment = True
+        schema_extra = {
+            "example": {
+                "event_type": "PUT",
+                "resource_type": "TASK",
+                "namespace": "default",
+                "name": "my_task",
+                "status": {"name": "my_task", "status": "running"},
+            }
+        }
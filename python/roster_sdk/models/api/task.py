@@ -10,6 +10,9 @@ class ExecuteTaskArgs(BaseModel):
     assignment: Optional[TaskAssignment] = Field(
         default=None, description="Who is assigned to the task."
     )
+    priority: int = Field(
+        default=0, description="Tasks with a higher priority are started first."
+    )
 
     class Config:
         validate_assignment = True
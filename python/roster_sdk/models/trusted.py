@@ -0,0 +1,81 @@
+import inspect
+from enum import Enum
+from typing import Any, Callable, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from pydantic.fields import ModelField
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+Builder = Callable[[Any], Any]
+
+# model -> [(field name, alias, builder, field)]
+_plans: dict[type, list[tuple[str, str, Builder, ModelField]]] = {}
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _builder(type_: Any) -> Builder:
+    """Builds values of type_ from (already valid) JSON data"""
+    origin = get_origin(type_)
+    if origin is Union:
+        args = [arg for arg in get_args(type_) if arg is not type(None)]
+        if len(args) != 1:
+            # Ambiguous without validating, so left as is
+            return _identity
+        build = _builder(args[0])
+        return lambda value: None if value is None else build(value)
+    if origin in (list, tuple, set, frozenset):
+        item_type, *_ = get_args(type_) or (Any,)
+        build_item = _builder(item_type)
+        if build_item is _identity:
+            return _identity if origin is list else origin
+        return lambda value: origin(map(build_item, value))
+    if origin is dict:
+        _, value_type = get_args(type_) or (Any, Any)
+        build_value = _builder(value_type)
+        if build_value is _identity:
+            return _identity
+        return lambda value: {k: build_value(v) for k, v in value.items()}
+    if inspect.isclass(type_) and issubclass(type_, BaseModel):
+        return lambda value: (
+            value if isinstance(value, type_) else construct_trusted(type_, value)
+        )
+    if inspect.isclass(type_) and issubclass(type_, Enum):
+        return type_
+    return _identity
+
+
+def _plan(model: type) -> list[tuple[str, str, Builder, ModelField]]:
+    plan = _plans.get(model)
+    if plan is None:
+        plan = _plans[model] = [
+            (name, field.alias, _builder(field.outer_type_), field)
+            for name, field in model.__fields__.items()
+        ]
+    return plan
+
+
+def construct_trusted(model: Type[ModelType], data: dict) -> ModelType:
+    """Build model (and its nested models) from data without validating it.
+
+    Much faster than model(**data), but only safe for data known to be valid,
+    e.g. responses from the Roster API. Missing fields get their defaults.
+    """
+    values = {}
+    fields_set = set()
+    for name, alias, build, field in _plan(model):
+        if alias in data:
+            value = data[alias]
+            values[name] = None if value is None else build(value)
+            fields_set.add(name)
+        elif not field.required:
+            values[name] = field.get_default()
+    # What model.construct does, minus its per-call overhead
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__fields_set__", fields_set)
+    instance._init_private_attributes()
+    return instance
@@ -0,0 +1,22 @@
+import json
+from typing import Any, Optional
+
+# orjson is used when it is installed, since it is several times faster
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON encoding of plain (dict/list/str/number) data"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def sse_frame(data: bytes, event_id: Optional[int] = None) -> bytes:
+    """Frame a JSON payload (which never contains raw newlines) as an SSE event"""
+    if event_id is None:
+        return b"data: " + data + b"\n\n"
+    return b"id: %d\ndata: %s\n\n" % (event_id, data)
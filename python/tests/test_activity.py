@@ -0,0 +1,263 @@
+import asyncio
+import contextvars
+import json
+import os
+import threading
+
+import pytest
+from roster_sdk.agent.activity_log import ActivityLog
+from roster_sdk.agent.broker import ActivityBroker, SlowConsumerPolicy
+from roster_sdk.agent.context import (
+    get_agent_activity_context,
+    set_agent_activity_context,
+)
+from roster_sdk.agent.entrypoint import Entrypoint
+from roster_sdk.agent.logs import get_roster_activity_logger
+from roster_sdk.agent.workers import ProcessWorkers, ThreadWorkers
+from roster_sdk.config import AgentConfig
+from roster_sdk.models.api.activity import (
+    ActivityEvent,
+    ActivityRecord,
+    ActivityType,
+    AgentContext,
+    AgentContextRecord,
+    ExecutionType,
+)
+from roster_sdk.serialization import sse_frame
+
+
+def activity_event(content: str) -> ActivityEvent:
+    return ActivityEvent(
+        execution_id="execution-1",
+        execution_type=ExecutionType.TASK,
+        type=ActivityType.THOUGHT,
+        content=content,
+    )
+
+
+@pytest.mark.asyncio
+async def test_every_subscriber_receives_every_event():
+    broker = ActivityBroker()
+    first, second = broker.subscribe(), broker.subscribe()
+    for i in range(3):
+        broker.publish(activity_event(str(i)))
+
+    assert len(await first.get()) == 3
+    assert len(await second.get()) == 3
+    assert await first.get(timeout=0.01) == []
+
+
+@pytest.mark.asyncio
+async def test_activity_stream_does_not_leak_subscriptions():
+    entrypoint = Entrypoint(agent=None, config=AgentConfig())
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/activity-stream",
+        "headers": [],
+        "query_string": b"",
+        "client": ("client", 1234),
+        "server": ("agent", 80),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+    }
+
+    # The client goes away before anything is streamed
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    await entrypoint.app(scope, receive, send)
+    assert not entrypoint.activity_broker.subscriptions
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_policies():
+    broker = ActivityBroker(max_buffer_size=2)
+    subscription = broker.subscribe()
+    for i in range(5):
+        broker.publish(activity_event(str(i)))
+    items = await subscription.get()
+    assert items == [
+        (i + 1, sse_frame(activity_event(str(i)).serialize(), event_id=i + 1))
+        for i in (3, 4)
+    ]
+    assert subscription.dropped == 3
+
+    broker = ActivityBroker(max_buffer_size=2, policy=SlowConsumerPolicy.DISCONNECT)
+    subscription = broker.subscribe()
+    for i in range(3):
+        broker.publish(activity_event(str(i)))
+    assert await subscription.get() is None
+    assert not broker.subscriptions
+
+
+def test_serialize_encodes_once():
+    event = activity_event('say "hi"')
+    assert json.loads(event.serialize()) == json.loads(event.json())
+    assert sse_frame(b"{}", event_id=7) == b"id: 7\ndata: {}\n\n"
+
+
+def test_activity_log_replays_by_execution_and_enforces_retention(tmp_path):
+    log = ActivityLog(str(tmp_path), max_segment_bytes=1, max_total_bytes=10**6)
+    broker = ActivityBroker(activity_log=log)
+    for i in range(4):
+        event = activity_event(str(i))
+        event.execution_id = f"execution-{i % 2}"
+        broker.publish(event)
+
+    assert len(log.segments) == 4
+    assert [i for i, _ in log.read_execution("execution-0")] == [1, 3]
+    assert [i for i, _ in log.read_execution("execution-0", since=1)] == [3]
+    assert [i for i, _ in log.read_since(2)] == [3, 4]
+    assert json.loads(log.read_execution("execution-1")[-1][1])["content"] == "3"
+    log.close()
+
+    # Event ids carry on after a restart, and old segments are removed
+    log = ActivityLog(str(tmp_path), max_segment_bytes=1, max_total_bytes=1)
+    assert ActivityBroker(activity_log=log).last_event_id == 4
+    log.append("execution-0", b"{}")
+    assert [i for i, _ in log.read_since(0)] == [5]
+    assert log.read_execution("execution-0") == [(5, b"{}")]
+    log.close()
+
+
+def test_activity_log_skips_malformed_lines(tmp_path):
+    log = ActivityLog(str(tmp_path))
+    log.append("execution-0", b"{}")
+    log.close()
+    with open(log.segments[0].path, "ab") as f:
+        f.write(
+            b'garbage\nnot a number\t"execution-0"\t{}\n3\t"execution-0"\t{}\n4\t"exec'
+        )
+
+    # Malformed lines are skipped, and the partially written one is truncated
+    log = ActivityLog(str(tmp_path))
+    assert log.last_event_id == 3
+    assert len(log.index["execution-0"]) == 2
+    assert [i for i, _ in log.read_execution("execution-0")] == [1, 3]
+    assert [i for i, _ in log.read_since(0)] == [1, 3]
+    assert log.append("execution-0", b"{}") == 4
+    assert [i for i, _ in log.read_since(3)] == [4]
+    log.close()
+
+
+@pytest.mark.asyncio
+async def test_activity_log_writes_in_batches_off_the_loop(tmp_path):
+    log = ActivityLog(str(tmp_path))
+    for i in range(3):
+        log.append(f"execution-{i % 2}", b"{}")
+    # Nothing has been written on the event loop
+    assert not os.path.exists(log.segments[0].path)
+    assert [i for i, _ in await log.aread_execution("execution-0")] == [1, 3]
+    log.append("execution-1", b"{}")
+    await asyncio.sleep(0.05)
+    assert os.path.getsize(log.segments[0].path) == log.segments[0].size
+    log.close()
+
+
+@pytest.mark.asyncio
+async def test_activity_log_replays_in_batches(tmp_path):
+    log = ActivityLog(str(tmp_path), max_segment_bytes=100)
+    for i in range(7):
+        log.append("execution-0", b"{}")
+    assert len(log.segments) > 1
+
+    batches = [batch async for batch in log.aiter_since(1, batch_size=2)]
+    assert [[i for i, _ in batch] for batch in batches] == [[2, 3], [4, 5], [6, 7]]
+    log.close()
+
+
+async def think_on_thread(message: str) -> str:
+    get_roster_activity_logger().thought(message)
+    return threading.current_thread().name
+
+
+def think_in_process(message: str) -> int:
+    get_roster_activity_logger().thought(message)
+    return sum(range(1000))
+
+
+@pytest.mark.asyncio
+async def test_workers_carry_activity_context_and_events():
+    events = []
+    activity_logger = get_roster_activity_logger()
+    activity_logger.add_listener(events.append)
+    set_agent_activity_context("execution-1", ExecutionType.TASK, team="team")
+    threads, processes = ThreadWorkers(max_workers=2), ProcessWorkers(max_workers=1)
+    try:
+        thread_name = await threads.run(think_on_thread, "on a thread")
+        assert thread_name.startswith("roster-task")
+        assert await processes.run(think_in_process, "in a process") == 499500
+        # Events from the worker thread are handed over to this loop
+        await asyncio.sleep(0)
+    finally:
+        activity_logger.remove_listener(events.append)
+        loops = list(threads.loops)
+        await threads.aclose()
+        # Each worker's event loop is closed along with the workers
+        assert loops and all(loop.is_closed() for loop in loops)
+        processes.shutdown()
+
+    assert sorted(event.content for event in events) == ["in a process", "on a thread"]
+    assert all(event.execution_id == "execution-1" for event in events)
+    assert all(event.agent_context.team == "team" for event in events)
+
+
+def test_activity_record_matches_event():
+    record = ActivityRecord(
+        "execution-1",
+        ExecutionType.TASK,
+        ActivityType.ACTION,
+        "content",
+        AgentContextRecord("Alice", "team", "role"),
+    )
+    event = record.to_model()
+    assert isinstance(event, ActivityEvent)
+    assert event.agent_context.identity == "Alice"
+    assert record.serialize() == event.serialize()
+
+
+def test_activity_context_records_behave_like_models():
+    def set_context():
+        set_agent_activity_context("execution-1", ExecutionType.TASK, identity="Alice")
+        return get_agent_activity_context()
+
+    agent_ctx, execution_ctx = contextvars.copy_context().run(set_context)
+    assert agent_ctx.dict() == {"identity": "Alice", "team": "", "role": ""}
+    assert json.loads(execution_ctx.json()) == {
+        "execution_id": "execution-1",
+        "execution_type": "task",
+    }
+    assert agent_ctx == AgentContext(identity="Alice")
+    assert AgentContext(identity="Alice") == agent_ctx
+    assert agent_ctx.copy(update={"team": "team"}).team == "team"
+    assert agent_ctx != AgentContext(identity="Bob")
+    assert execution_ctx.json() == execution_ctx.to_model().json()
+    assert repr(agent_ctx) == "AgentContextRecord(identity='Alice', team='', role='')"
+
+
+def test_activity_records_do_not_build_models(monkeypatch):
+    def to_model(self):
+        raise AssertionError("Model built")
+
+    monkeypatch.setattr(ActivityRecord, "to_model", to_model)
+    monkeypatch.setattr(AgentContextRecord, "to_model", to_model)
+    record = ActivityRecord(
+        "execution-1",
+        ExecutionType.TASK,
+        ActivityType.ACTION,
+        "content",
+        AgentContextRecord("Alice", "team", "role"),
+    )
+    assert record.dict()["agent_context"] == {
+        "identity": "Alice",
+        "team": "team",
+        "role": "role",
+    }
+    assert json.loads(record.json())["type"] == "action"
+    assert record == record.copy() and record != record.copy(update={"content": ""})
+    assert "Alice" in repr(record)
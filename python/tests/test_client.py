@@ -0,0 +1,653 @@
+import asyncio
+import itertools
+import json
+import sys
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from roster_sdk import agent  # noqa: F401 (must be imported before roster_sdk.client)
+from roster_sdk.agent.context import set_agent_activity_context, set_agent_deadline
+from roster_sdk.agent.conversations import ConversationStore
+from roster_sdk.client import errors
+from roster_sdk.client.agent import CollaborationInterface
+from roster_sdk.client.base import RosterClient, _iter_json_array
+from roster_sdk.client.cache import ResourceCache
+from roster_sdk.client.informer import CacheInvalidator, RosterInformer
+from roster_sdk.client.retry import CircuitBreaker, CircuitState
+from roster_sdk.client.singleflight import SingleFlight
+from roster_sdk.models.api.activity import ExecutionType
+from roster_sdk.models.chat import ChatMessage
+from roster_sdk.models.resources.team import TeamResource, TeamSpec
+from roster_sdk.models.resources.team_layout import TeamLayoutResource, TeamLayoutSpec
+
+TEAM = TeamResource.initial_state(TeamSpec(**TeamSpec.Config.schema_extra["example"]))
+
+
+@pytest_asyncio.fixture
+async def roster_api():
+    calls = []
+    resources = {
+        "agents": {},
+        "roles": {},
+        "teams": {TEAM.spec.name: TEAM.dict()},
+        "team-layouts": {},
+        "tasks": {},
+    }
+    events = asyncio.Queue()
+    settings = {"delay": 0, "list_delay": 0, "failures": 0, "chat_delays": {}}
+
+    async def list_resources(request: web.Request) -> web.Response:
+        calls.append(request)
+        kind = request.match_info["kind"]
+        listing = list(resources[kind].values())
+        await asyncio.sleep(settings["list_delay"])
+        return web.json_response(listing)
+
+    async def get_resource(request: web.Request) -> web.Response:
+        calls.append(request)
+        kind, name = request.match_info["kind"], request.match_info["name"]
+        await asyncio.sleep(settings["delay"])
+        if settings["failures"]:
+            settings["failures"] -= 1
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        if name not in resources[kind]:
+            return web.Response(status=404)
+        return web.json_response(resources[kind][name])
+
+    async def create_resource(request: web.Request) -> web.Response:
+        calls.append(request)
+        kind, data = request.match_info["kind"], await request.json()
+        name = data["spec"]["name"]
+        if name in resources[kind]:
+            return web.Response(status=409)
+        resources[kind][name] = data
+        return web.json_response(data)
+
+    async def resource_events(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        while True:
+            event = await events.get()
+            await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+
+    async def agent_chat_stream(request: web.Request) -> web.StreamResponse:
+        message = (await request.json())["message"]["message"]
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in message.split():
+            await response.write(f"data: {json.dumps({'token': token})}\n\n".encode())
+        if message.endswith("!"):
+            await response.write(b'data: {"error": "interrupted"}\n\n')
+        return response
+
+    async def agent_chat(request: web.Request) -> web.Response:
+        # Mimics the API forwarding to an agent's /chat
+        data = await request.json()
+        calls.append(data)
+        await asyncio.sleep(settings["chat_delays"].get(data["role"], 0))
+        messages = [ChatMessage(**m) for m in data["history"] + [data["message"]]]
+        if "conversation_id" not in data:
+            return web.json_response({"sender": "agent", "message": "ok"})
+        history = conversations.update(
+            data["conversation_id"], data["sequence"], messages
+        )
+        if history is None:
+            return web.Response(status=409)
+        reply = ChatMessage(sender="agent", message=f"seen {len(history)}")
+        length = conversations.append(data["conversation_id"], reply)
+        return web.json_response({**reply.dict(), "conversation_length": length})
+
+    conversations = ConversationStore(max_size=1)
+    app = web.Application()
+    app.router.add_post("/commands/agent-chat", agent_chat)
+    app.router.add_post("/commands/agent-chat/stream", agent_chat_stream)
+    app.router.add_get("/resource-events", resource_events)
+    app.router.add_get("/{kind}", list_resources)
+    app.router.add_post("/{kind}", create_resource)
+    app.router.add_get("/{kind}/{name}", get_resource)
+    server = TestServer(app)
+    await server.start_server()
+    server.calls = calls
+    server.resources = resources
+    server.events = events
+    server.settings = settings
+    server.conversations = conversations
+    yield server
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def client(roster_api):
+    async with RosterClient(roster_api_url=str(roster_api.make_url(""))) as client:
+        yield client
+
+
+async def drain_events(roster_api):
+    while roster_api.events.qsize():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused(roster_api, client):
+    await client.team.get(TEAM.spec.name)
+    session = client.session
+    await client.team.get(TEAM.spec.name)
+    assert client.session is session
+    assert len(roster_api.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_session(client):
+    session = client.session
+    await client.aclose()
+    assert session.closed
+    assert client.session is not session
+
+
+@pytest.mark.asyncio
+async def test_informer_serves_reads_from_events(roster_api, client):
+    informer = RosterInformer(client)
+    informer.start()
+    await informer.wait_for_sync(timeout=5)
+    calls_after_sync = len(roster_api.calls)
+
+    assert (await client.team.get(TEAM.spec.name)) == TEAM
+
+    updated_status = TEAM.status.copy(update={"status": "inactive"})
+    await roster_api.events.put(
+        {
+            "event_type": "PUT",
+            "resource_type": "TEAM",
+            "name": TEAM.spec.name,
+            "status": updated_status.dict(),
+        }
+    )
+    await drain_events(roster_api)
+    assert (await client.team.get(TEAM.spec.name)).status.status == "inactive"
+
+    await roster_api.events.put(
+        {"event_type": "DELETE", "resource_type": "TEAM", "name": TEAM.spec.name}
+    )
+    await drain_events(roster_api)
+    assert await client.team.list() == []
+
+    assert len(roster_api.calls) == calls_after_sync
+    await informer.stop()
+
+
+@pytest.mark.asyncio
+async def test_informer_skips_invalid_resources(roster_api, client):
+    roster_api.resources["teams"]["Invalid"] = {"kind": "Team", "spec": {}}
+    informer = RosterInformer(client)
+    informer.start()
+    await informer.wait_for_sync(timeout=5)
+    assert [team.spec.name for team in await client.team.list()] == [TEAM.spec.name]
+    await informer.stop()
+
+
+@pytest.mark.asyncio
+async def test_informer_relist_does_not_undo_newer_events(roster_api, client):
+    informer = RosterInformer(client)
+    informer.start()
+    await informer.wait_for_sync(timeout=5)
+
+    # The listing is taken before the event, but arrives after it
+    roster_api.settings["list_delay"] = 0.2
+    relist = asyncio.create_task(informer.resync())
+    await asyncio.sleep(0.05)
+    inactive = TEAM.status.copy(update={"status": "inactive"})
+    await roster_api.events.put(
+        {
+            "event_type": "PUT",
+            "resource_type": "TEAM",
+            "name": TEAM.spec.name,
+            "status": inactive.dict(),
+        }
+    )
+    await relist
+    assert (await client.team.get(TEAM.spec.name)).status.status == "inactive"
+
+    # Events for older versions are ignored
+    roster_api.settings["list_delay"] = 0
+    versioned = TEAM.copy(deep=True)
+    versioned.metadata["resource_version"] = "2"
+    roster_api.resources["teams"][TEAM.spec.name] = versioned.dict()
+    await informer.resync()
+    versioned.metadata["resource_version"] = "1"
+    await roster_api.events.put(
+        {
+            "event_type": "PUT",
+            "resource_type": "TEAM",
+            "name": TEAM.spec.name,
+            "resource": {**versioned.dict(), "status": inactive.dict()},
+        }
+    )
+    await drain_events(roster_api)
+    team = await client.team.get(TEAM.spec.name)
+    assert (team.metadata["resource_version"], team.status.status) == ("2", "active")
+    await informer.stop()
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_and_invalidation(roster_api, client):
+    client.cache = ResourceCache(max_size=8, ttl=60)
+    invalidator = CacheInvalidator(client)
+    invalidator.start()
+    await asyncio.sleep(0.1)
+
+    for _ in range(3):
+        assert (await client.team.get(TEAM.spec.name)) == TEAM
+    assert len(roster_api.calls) == 1
+    assert client.cache.stats.hits == 2
+    assert client.cache.stats.misses == 1
+
+    # Cached resources can't be changed through what a caller got back
+    team = await client.team.get(TEAM.spec.name)
+    team.spec.name = "Changed"
+    assert (await client.team.get(TEAM.spec.name)) == TEAM
+
+    await roster_api.events.put(
+        {"event_type": "DELETE", "resource_type": "TEAM", "name": TEAM.spec.name}
+    )
+    await drain_events(roster_api)
+    await client.team.get(TEAM.spec.name)
+    assert len(roster_api.calls) == 2
+    await invalidator.stop()
+
+
+def test_cache_lru_eviction_and_ttl():
+    now = [0.0]
+    cache = ResourceCache(max_size=2, ttl=10, ttls={"TASK": 1}, clock=lambda: now[0])
+    cache.put("TEAM", "a", 1)
+    cache.put("TEAM", "b", 2)
+    assert cache.get("TEAM", "a") == 1
+    cache.put("TEAM", "c", 3)
+    assert cache.get("TEAM", "b") is None
+    assert cache.stats.evictions == 1
+
+    cache.put("TASK", "t", 4)
+    now[0] = 2.0
+    assert cache.get("TASK", "t") is None
+    assert cache.get("TEAM", "c") == 3
+    assert cache.stats.expirations == 1
+
+
+def test_client_can_be_shared_by_threads(roster_api):
+    # e.g. by task worker threads, each with its own event loop
+    client = RosterClient(roster_api_url=str(roster_api.make_url("")))
+    clock = itertools.count()
+    client.cache = ResourceCache(max_size=4, ttl=2, clock=lambda: next(clock))
+
+    async def use_client(thread: int):
+        session = client.session
+        for i in range(20000):
+            name = f"team-{(thread + i) % 2}"
+            # Entries expire all the time, and are evicted by the other threads
+            client.cache.get("TEAM", name)
+            client.cache.put("TEAM", name, i)
+            if i % 7 == 0:
+                client.cache.invalidate("TEAM", name)
+            client.circuit_breaker(f"/kind-{i % 2}")
+        await client.aclose()
+        return session
+
+    # Switch threads as often as possible, to make races likely
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sessions = list(
+                executor.map(lambda i: asyncio.run(use_client(i)), range(8))
+            )
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(set(map(id, sessions))) == 8
+    assert all(session.closed for session in sessions)
+    assert not client._sessions
+    assert len(client.cache) <= 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_are_coalesced(roster_api, client):
+    roster_api.settings["delay"] = 0.1
+    teams = await asyncio.gather(*(client.team.get(TEAM.spec.name) for _ in range(10)))
+    assert all(team == TEAM for team in teams)
+    assert len(roster_api.calls) == 1
+    assert client.single_flight.coalesced == 9
+    assert len(client.single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_are_only_coalesced_within_an_execution(roster_api, client):
+    roster_api.settings["chat_delays"]["Engineer"] = 0.05
+    data = {
+        "role": "Engineer",
+        "history": [],
+        "message": {"sender": "me", "message": "hi"},
+    }
+
+    async def post(execution_id=None):
+        if execution_id is not None:
+            set_agent_activity_context(execution_id, ExecutionType.TASK)
+        return await client.post("/commands/agent-chat", data, coalesce=True)
+
+    # Unrelated callers outside an execution each get their own request
+    await asyncio.gather(post(), post())
+    assert len(roster_api.calls) == 2
+    await asyncio.gather(post("execution-1"), post("execution-1"), post("other"))
+    assert len(roster_api.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_coalesced_read_survives_caller_cancellation(roster_api, client):
+    roster_api.settings["delay"] = 0.1
+    first = asyncio.create_task(client.team.get(TEAM.spec.name))
+    second = asyncio.create_task(client.team.get(TEAM.spec.name))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert (await second) == TEAM
+    assert first.cancelled()
+    assert len(roster_api.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_forgets_abandoned_calls():
+    single_flight = SingleFlight()
+    started = []
+
+    async def call():
+        started.append(None)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    first = asyncio.create_task(single_flight.do("key", call))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    # Joins before the abandoned call has finished cancelling
+    second = asyncio.create_task(single_flight.do("key", call))
+    await asyncio.sleep(0)
+    assert await second == 2
+    assert first.cancelled()
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_many_falls_back_to_single_creates(roster_api, client):
+    teams = [TEAM.copy(deep=True) for _ in range(3)]
+    teams[0].spec.name = "Blue Team"
+    teams[2].spec.name = "Green Team"
+
+    results = await client.team.create_many([team.dict() for team in teams])
+
+    assert client.team.batch_supported is False
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[0].value.spec.name == "Blue Team"
+    assert results[2].value.spec.name == "Green Team"
+    assert set(roster_api.resources["teams"]) == {
+        TEAM.spec.name,
+        "Blue Team",
+        "Green Team",
+    }
+
+
+class ChunkedContent:
+    def __init__(self, data: bytes, size: int):
+        self.chunks = [data[i : i + size] for i in range(0, len(data), size)]
+
+    async def iter_chunked(self, _size: int):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_across_chunk_boundaries():
+    items = [{"name": f"tâsk-{i}", "values": [i, i * 1.5, None]} for i in range(20)]
+    items += [12345, "a string", True]
+    data = json.dumps(items, ensure_ascii=False).encode("utf-8")
+    for size in (1, 7, 64, len(data)):
+        parsed = [item async for item in _iter_json_array(ChunkedContent(data, size))]
+        assert parsed == items
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_numbers_split_across_chunks():
+    for chunks in (
+        [b"[1.", b"5]"],
+        [b"[1", b"e3, 2E", b"-2, -", b"7]"],
+        [b"[0.25 ", b", tr", b"ue]"],
+    ):
+        content = ChunkedContent(b"", 1)
+        content.chunks = chunks
+        parsed = [item async for item in _iter_json_array(content)]
+        assert parsed == json.loads(b"".join(chunks))
+
+
+@pytest.mark.asyncio
+async def test_alist_pages_through_listing(roster_api, client):
+    for i in range(5):
+        team = TEAM.copy(deep=True)
+        team.spec.name = f"Team {i}"
+        roster_api.resources["teams"][team.spec.name] = team.dict()
+
+    pages = [page async for page in client.team.alist(page_size=2)]
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert all(isinstance(team, TeamResource) for page in pages for team in page)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_retried_on_unavailable(roster_api, client):
+    roster_api.settings["failures"] = 2
+    assert (await client.team.get(TEAM.spec.name)) == TEAM
+    assert len(roster_api.calls) == 3
+
+    roster_api.settings["failures"] = 3
+    with pytest.raises(errors.UnexpectedStatus):
+        await client.team.get(TEAM.spec.name)
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures(roster_api, client):
+    client.circuit_breaker_threshold = 2
+    roster_api.settings["failures"] = 10
+    # The circuit opens while the first read is still retrying
+    with pytest.raises(errors.CircuitOpen):
+        await client.team.get(TEAM.spec.name)
+    calls = len(roster_api.calls)
+    assert calls == 2
+    with pytest.raises(errors.CircuitOpen):
+        await client.team.get(TEAM.spec.name)
+    assert len(roster_api.calls) == calls
+
+
+def test_circuit_breaker_half_open_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 5.0
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_bounded_by_the_deadline(roster_api, client):
+    async def get_with_deadline(timeout: float, wait: float = 0):
+        set_agent_deadline(timeout)
+        await asyncio.sleep(wait)
+        return await client.team.get(TEAM.spec.name)
+
+    # The remaining budget is passed on to the API
+    await asyncio.create_task(get_with_deadline(5))
+    assert 0 < float(roster_api.calls[-1].headers["X-Roster-Timeout"]) <= 5
+
+    roster_api.settings["delay"] = 1
+    with pytest.raises(errors.DeadlineExceeded):
+        await asyncio.create_task(get_with_deadline(0.1))
+    # Nothing is sent once the deadline has passed
+    calls = len(roster_api.calls)
+    with pytest.raises(errors.DeadlineExceeded):
+        await asyncio.create_task(get_with_deadline(0.01, wait=0.02))
+    assert len(roster_api.calls) == calls
+
+
+@pytest.mark.asyncio
+async def test_reads_are_only_coalesced_with_the_same_deadline(roster_api, client):
+    roster_api.settings["delay"] = 0.2
+
+    async def get_with_deadline(timeout: Optional[float]):
+        set_agent_deadline(timeout)
+        return await client.team.get(TEAM.spec.name)
+
+    short, long, other_long, without = await asyncio.gather(
+        get_with_deadline(0.1),
+        get_with_deadline(5),
+        get_with_deadline(5),
+        get_with_deadline(None),
+        return_exceptions=True,
+    )
+    # Each caller gets what its own deadline allows
+    assert isinstance(short, errors.DeadlineExceeded)
+    assert long == other_long == without == TEAM
+    assert len(roster_api.calls) == 4
+    budgets = sorted(
+        float(call.headers["X-Roster-Timeout"]) for call in roster_api.calls
+    )
+    assert budgets[0] <= 0.1 and 1 < budgets[1] <= 5 and budgets[3] == 30
+
+
+@pytest.mark.asyncio
+async def test_chat_prompt_agent_stream_yields_tokens(client):
+    async def stream(text: str) -> list[str]:
+        message = ChatMessage(sender="me", message=text)
+        return [
+            token
+            async for token in client.chat_prompt_agent_stream(
+                "role", "team", [], message
+            )
+        ]
+
+    assert await stream("one two three") == ["one", "two", "three"]
+    with pytest.raises(errors.RosterClientException):
+        await stream("cut short!")
+
+
+@pytest.mark.asyncio
+async def test_conversations_only_send_new_messages(roster_api, client):
+    history = []
+
+    async def say(text: str, conversation_id: str = "c1") -> str:
+        message = ChatMessage(sender="me", message=text)
+        reply = await client.chat_prompt_agent(
+            "role", "team", history, message, conversation_id=conversation_id
+        )
+        history.extend([message, reply])
+        return reply.message
+
+    assert await say("hi") == "seen 1"
+    assert await say("how are you?") == "seen 3"
+    assert roster_api.calls[-1]["sequence"] == 2
+    assert roster_api.calls[-1]["history"] == []
+
+    # The agent forgets c1 (it only remembers one conversation),
+    # so the full history is sent again
+    roster_api.conversations.update("c2", 0, [])
+    assert await say("still there?") == "seen 5"
+    assert roster_api.calls[-1]["sequence"] == 0
+    assert len(roster_api.calls[-1]["history"]) == 4
+
+
+def test_conversation_store_evicts_idle_conversations():
+    now = [0.0]
+    store = ConversationStore(idle_timeout=10, clock=lambda: now[0])
+    message = ChatMessage(sender="me", message="hi")
+    assert store.update("c", 0, [message]) == [message]
+    assert store.update("c", 2, [message]) is None
+    assert len(store.update("c", 1, [message])) == 2
+    now[0] = 11
+    assert store.update("c", 2, [message]) is None
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_collaboration_snapshot_resolves_manager(roster_api, client):
+    layout = TeamLayoutResource.initial_state(
+        TeamLayoutSpec(
+            name=TEAM.spec.type,
+            peer_groups={"group": ["member1", "member2", "member3"]},
+            management_groups={"member2": ["member1"]},
+        )
+    )
+    roster_api.resources["team-layouts"][layout.spec.name] = layout.dict()
+    now = [0.0]
+    collaboration = CollaborationInterface(
+        TEAM.spec.name, "member1", client=client, clock=lambda: now[0]
+    )
+
+    snapshot = await collaboration.get_snapshot()
+    assert snapshot.get_manager("member1") == "member2"
+    assert snapshot.get_manager("member2") is None
+    assert snapshot.get_peers("member1") == ("member2", "member3")
+    assert snapshot.get_role("RoleName").description == "A description of the role."
+
+    reply = await collaboration.ask_manager("How am I doing?")
+    assert reply.message == "ok"
+    assert roster_api.calls[-1]["role"] == "member2"
+    assert roster_api.calls[-1]["message"]["sender"] == "Alice"
+
+    # The snapshot is reused until it expires
+    fetches = len(roster_api.calls)
+    await collaboration.get_role_context()
+    assert len(roster_api.calls) == fetches
+    now[0] = collaboration.snapshot_ttl
+    await collaboration.get_role_context()
+    assert len(roster_api.calls) == fetches + 2
+
+    manager = CollaborationInterface(TEAM.spec.name, "member2", client=client)
+    assert await manager.ask_manager("Anyone?") == "Manager not found."
+
+
+@pytest.mark.asyncio
+async def test_ask_team_members_returns_partial_results(roster_api, client):
+    roster_api.settings["chat_delays"] = {"slow": 0.2, "fast": 0.05}
+    collaboration = CollaborationInterface(TEAM.spec.name, "member1", client=client)
+
+    started = asyncio.get_running_loop().time()
+    replies = await collaboration.ask_team_members(
+        ["fast", "slow", "also fast", "fast"], "Status?", timeout=0.1
+    )
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert list(replies) == ["fast", "slow", "also fast"]
+    assert replies["fast"].message == replies["also fast"].message == "ok"
+    assert replies["slow"] == "Team member did not answer in time."
+    # Asked at once, and the slow member didn't hold up the rest
+    assert elapsed < 0.2
+
+
+@pytest.mark.asyncio
+async def test_trusted_client_skips_validation(roster_api):
+    url = str(roster_api.make_url(""))
+    async with RosterClient(roster_api_url=url, trusted=True) as client:
+        team = await client.team.get(TEAM.spec.name)
+        assert team == TEAM
+        assert isinstance(
+            team.spec.members["member1"], type(TEAM.spec.members["member1"])
+        )
+
+        # Invalid data gets through (which is why it's opt-in)
+        roster_api.resources["teams"]["Invalid"] = {**TEAM.dict(), "kind": "Task"}
+        assert (await client.team.get("Invalid")).kind == "Task"
+    async with RosterClient(roster_api_url=url) as client:
+        with pytest.raises(ValueError):
+            await client.team.get("Invalid")
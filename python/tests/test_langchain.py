@@ -85,3 +85,60 @@ async def test_entrypoint(process_manager):
             response = await response.json()
             assert response["sender"] == TESTING_AGENT_NAME
             assert "Assistant" in response["message"]
+
+
+@pytest.mark.asyncio
+async def test_token_stream_handler_forwards_tokens():
+    from roster_sdk.adapters.langchain import RosterTokenStreamHandler
+
+    handler = RosterTokenStreamHandler()
+
+    async def run():
+        for token in ("Hello", ", ", "world"):
+            await handler.on_llm_new_token(token, run_id=None)
+            await asyncio.sleep(0)
+        return "Hello, world"
+
+    assert [token async for token in handler.stream(run())] == [
+        "Hello",
+        ", ",
+        "world",
+    ]
+
+    # LLMs that don't stream still produce a response
+    async def run_without_tokens():
+        return "Hi"
+
+    handler = RosterTokenStreamHandler()
+    assert [token async for token in handler.stream(run_without_tokens())] == ["Hi"]
+
+
+def test_agent_cache_reuses_and_evicts():
+    from roster_sdk.adapters.langchain import RosterAgentCache
+
+    cache = RosterAgentCache(max_size=2)
+    built = []
+
+    def build():
+        built.append(object())
+        return built[-1]
+
+    first = cache.get("team", "role", build, model="gpt-4")
+    assert cache.get("team", "role", build, model="gpt-4") is first
+    # Different config, different agent
+    assert cache.get("team", "role", build, model="gpt-3.5") is not first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.get("team", "other", build)
+    assert len(cache) == 2
+    # The least recently used entry was evicted
+    assert cache.get("team", "role", build, model="gpt-4") is not first
+
+
+def test_langchain_tools_are_cached_per_role():
+    from roster_sdk.adapters.langchain import get_roster_langchain_tools
+
+    tools = get_roster_langchain_tools("team", "role")
+    again = get_roster_langchain_tools("team", "role")
+    assert tools is not again
+    assert [id(tool) for tool in tools] == [id(tool) for tool in again]
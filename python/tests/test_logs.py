@@ -0,0 +1,71 @@
+import gzip
+import json
+import logging
+import logging.handlers
+import threading
+
+import pytest
+from roster_sdk.agent import logs
+from roster_sdk.agent.logs import JsonLinesFormatter, _gzip_namer, _gzip_rotator
+
+
+def test_json_lines_and_gzipped_rotation(tmp_path):
+    log_file = str(tmp_path / "agent.log")
+    handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=200, backupCount=2
+    )
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(JsonLinesFormatter())
+    logger = logging.getLogger("roster-agent-test")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        for i in range(10):
+            logger.info("message %d", i)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    with open(log_file) as f:
+        last = json.loads(f.readlines()[-1])
+    assert last["message"] == "message 9"
+    assert last["level"] == "INFO"
+    backups = sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".gz"))
+    assert backups == ["agent.log.1.gz", "agent.log.2.gz"]
+    with gzip.open(tmp_path / "agent.log.1.gz", "rt") as f:
+        assert all(json.loads(line) for line in f)
+
+
+class ThreadRecorder(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def emit(self, record: logging.LogRecord):
+        self.threads.append(threading.current_thread())
+
+
+@pytest.mark.asyncio
+async def test_records_are_handled_off_the_event_loop(tmp_path, monkeypatch):
+    log_file = tmp_path / "agent.log"
+    monkeypatch.setenv("ROSTER_AGENT_LOG_FILE", str(log_file))
+    monkeypatch.setenv("ROSTER_AGENT_LOG_FORMAT", "json")
+    # Set up again, with the settings above
+    logs.stop_logging()
+    logger = logs.get_logger()
+    recorder = ThreadRecorder()
+    logs.log_listener.handlers += (recorder,)
+    try:
+        for i in range(100):
+            logger.debug("message %d", i)
+    finally:
+        # Everything queued is written out on shutdown
+        logs.stop_logging()
+
+    assert len(recorder.threads) == 100
+    assert threading.current_thread() not in recorder.threads
+    with open(log_file) as f:
+        messages = [json.loads(line)["message"] for line in f]
+    assert messages == [f"message {i}" for i in range(100)]
+    assert not logger.handlers
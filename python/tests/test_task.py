@@ -0,0 +1,391 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from roster_sdk import agent  # noqa: F401 (must be imported before roster_sdk.client)
+from roster_sdk.agent.context import (
+    agent_deadline,
+    set_agent_activity_context,
+    set_agent_deadline,
+)
+from roster_sdk.agent.entrypoint import Entrypoint
+from roster_sdk.agent.workers import ThreadWorkers
+from roster_sdk.client import errors
+from roster_sdk.client.agent.task.interface import TaskInterface
+from roster_sdk.client.agent.task.manager import TaskManager
+from roster_sdk.client.agent.task.outbox import StatusUpdateOutbox
+from roster_sdk.client.agent.task.pipeline import StatusUpdatePipeline
+from roster_sdk.client.base import RosterClient
+from roster_sdk.config import AgentConfig
+from roster_sdk.models.api.activity import ExecutionType
+from roster_sdk.models.resources.task import TaskAssignment
+
+
+def status_update_event(task: str, status: str) -> dict:
+    return {
+        "event_type": "PUT",
+        "resource_type": "TASK",
+        "namespace": "default",
+        "name": task,
+        "status": {"name": task, "status": status},
+    }
+
+
+@pytest_asyncio.fixture
+async def roster_api():
+    requests = []
+    settings = {"batch": True, "down": False, "events": True}
+
+    async def status_update(request: web.Request) -> web.Response:
+        if settings["down"]:
+            return web.Response(status=500)
+        requests.append([await request.json()])
+        return web.json_response(None)
+
+    async def status_update_batch(request: web.Request) -> web.Response:
+        if settings["down"]:
+            return web.Response(status=500)
+        if not settings["batch"]:
+            return web.Response(status=404)
+        requests.append((await request.json())["events"])
+        return web.json_response(None)
+
+    async def create_task(request: web.Request) -> web.Response:
+        spec = await request.json()
+        tasks[spec["name"]] = spec
+        # The subtask's result is "<description> done", unless it's meant to fail
+        failed = spec["description"] == "fail"
+        status = {
+            "name": spec["name"],
+            "status": "error" if failed else "success",
+            "result": "" if failed else f"{spec['description']} done",
+            "error": "failed" if failed else "",
+        }
+        event = {
+            "event_type": "PUT",
+            "resource_type": "TASK",
+            "name": spec["name"],
+            "status": status,
+        }
+        for stream in streams:
+            asyncio.get_running_loop().call_later(0.01, stream.put_nowait, event)
+        asyncio.get_running_loop().call_later(
+            0.01, statuses.__setitem__, spec["name"], status
+        )
+        return web.json_response({"spec": spec, "status": {"name": spec["name"]}})
+
+    async def get_task(request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if name not in tasks:
+            return web.Response(status=404)
+        spec = tasks[name]
+        status = statuses.get(name, {"name": name})
+        return web.json_response({"spec": spec, "status": status})
+
+    async def resource_events(request: web.Request) -> web.StreamResponse:
+        if not settings["events"]:
+            return web.Response(status=404)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        # Every stream receives every event
+        stream = asyncio.Queue()
+        streams.append(stream)
+        while True:
+            event = await stream.get()
+            await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+
+    tasks = {"parent": {"name": "parent", "description": "the parent task"}}
+    statuses = {}
+    streams = []
+    app = web.Application()
+    app.router.add_get("/resource-events", resource_events)
+    app.router.add_post("/tasks", create_task)
+    app.router.add_get("/tasks/{name}", get_task)
+    app.router.add_post("/status-update", status_update)
+    app.router.add_post("/status-update/batch", status_update_batch)
+    server = TestServer(app)
+    await server.start_server()
+    server.requests = requests
+    server.tasks = tasks
+    server.settings = settings
+    yield server
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def client(roster_api):
+    async with RosterClient(roster_api_url=str(roster_api.make_url(""))) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_status_updates_are_batched_and_coalesced(roster_api, client):
+    pipeline = StatusUpdatePipeline(client, max_batch_size=3, flush_interval=10)
+    pipeline.submit(status_update_event("a", "running"))
+    first = pipeline.submit(status_update_event("b", "running"))
+    pipeline.submit(status_update_event("b", "success"))
+    last = pipeline.submit(status_update_event("c", "success"))
+
+    # The batch is full, so it is sent without waiting for the flush interval
+    await asyncio.wait_for(asyncio.gather(first, last), timeout=5)
+    assert len(roster_api.requests) == 1
+    assert [event["status"]["status"] for event in roster_api.requests[0]] == [
+        "running",
+        "success",
+        "success",
+    ]
+    await pipeline.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pending_updates_are_flushed_on_close(roster_api, client):
+    roster_api.settings["batch"] = False
+    pipeline = StatusUpdatePipeline(client, max_batch_size=50, flush_interval=10)
+    for task in ("a", "b"):
+        pipeline.submit(status_update_event(task, "success"))
+    await pipeline.aclose()
+
+    assert sorted(request[0]["name"] for request in roster_api.requests) == ["a", "b"]
+    assert client.status_update_batch_supported is False
+
+
+@pytest.mark.asyncio
+async def test_outbox_replays_undelivered_updates(roster_api, client, tmp_path):
+    outbox_path = str(tmp_path / "outbox.db")
+    roster_api.settings["down"] = True
+    pipeline = StatusUpdatePipeline(
+        client, flush_interval=10, outbox=StatusUpdateOutbox(outbox_path)
+    )
+    await pipeline.start()
+    failed = pipeline.submit(status_update_event("a", "success"))
+    await pipeline.aclose()
+    assert failed.exception() is not None
+    assert roster_api.requests == []
+
+    # The agent restarts once the API is back up
+    roster_api.settings["down"] = False
+    outbox = StatusUpdateOutbox(outbox_path)
+    pipeline = StatusUpdatePipeline(client, flush_interval=10, outbox=outbox)
+    await pipeline.start()
+    await pipeline.aclose()
+    assert roster_api.requests == [[status_update_event("a", "success")]]
+    assert await StatusUpdateOutbox(outbox_path).pending() == []
+
+
+@pytest.mark.asyncio
+async def test_pipeline_survives_unexpected_errors(roster_api, client):
+    status_updates = client.status_updates
+    failures = []
+
+    async def flaky_status_updates(events):
+        if len(failures) < 2:
+            # Not a RosterClientException, e.g. aiohttp's ContentTypeError
+            failures.append(asyncio.get_running_loop().time())
+            raise ValueError("Unexpected response")
+        return await status_updates(events)
+
+    client.status_updates = flaky_status_updates
+    pipeline = StatusUpdatePipeline(client, flush_interval=0.01)
+    delivered = pipeline.submit(status_update_event("a", "success"))
+
+    # The batch is requeued, and sent once the API recovers
+    await asyncio.wait_for(delivered, timeout=5)
+    assert roster_api.requests == [[status_update_event("a", "success")]]
+    # Retried with backoff
+    assert failures[1] - failures[0] >= 0.02
+
+    # Later updates still go out
+    await asyncio.wait_for(pipeline.submit(status_update_event("b", "success")), 5)
+    assert len(roster_api.requests) == 2
+    await pipeline.aclose()
+
+
+def assignment(team: str) -> TaskAssignment:
+    return TaskAssignment(
+        team_name=team, role_name="role", identity_name="identity", agent_name="agent"
+    )
+
+
+@pytest.mark.asyncio
+async def test_task_manager_bounds_concurrency_and_is_fair(roster_api, client):
+    manager = TaskManager(
+        TaskInterface("agent", client), max_concurrency=1, max_pending=4
+    )
+    started = []
+    release = asyncio.Event()
+
+    async def executor(name, description, assignment):
+        started.append(name)
+        await release.wait()
+        return "done"
+
+    manager.run_task(executor, "first", "", assignment("a"))
+    for name in ("a1", "a2", "b1"):
+        manager.run_task(executor, name, "", assignment(name[0]))
+    manager.run_task(executor, "urgent", "", assignment("a"), priority=1)
+    assert manager.queue_depth == 4
+    with pytest.raises(errors.TaskQueueFull) as e:
+        manager.run_task(executor, "rejected", "", assignment("c"))
+    assert e.value.queue_depth == 4
+
+    # One at a time: priority first, then teams take turns
+    release.set()
+    while manager.running_tasks:
+        await asyncio.sleep(0.01)
+    assert started == ["first", "urgent", "a1", "b1", "a2"]
+    assert manager.stats.finished == 5
+    assert manager.stats.rejected == 1
+    assert len(roster_api.requests) == 5
+
+
+@pytest.mark.asyncio
+async def test_task_manager_drains_on_close(roster_api, client):
+    manager = TaskManager(
+        TaskInterface("agent", client), max_concurrency=2, max_pending=4
+    )
+
+    async def quick(name, description, assignment):
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def stuck(name, description, assignment):
+        await asyncio.Event().wait()
+
+    manager.run_task(quick, "quick", "", assignment("a"))
+    manager.run_task(stuck, "stuck", "", assignment("a"))
+    manager.run_task(quick, "queued", "", assignment("a"))
+
+    assert sorted(await manager.drain(timeout=0.5)) == ["queued", "stuck"]
+    with pytest.raises(errors.TaskManagerDraining):
+        manager.run_task(quick, "late", "", assignment("a"))
+    assert not manager.running_tasks
+    statuses = {request[0]["name"]: request[0] for request in roster_api.requests}
+    assert statuses["quick"]["status"]["status"] == "success"
+    assert statuses["stuck"]["status"]["error"] == "Interrupted by agent shutdown"
+    assert statuses["queued"]["status"]["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_task_manager_cancels_tasks_past_their_deadline(roster_api, client):
+    manager = TaskManager(TaskInterface("agent", client))
+
+    async def stuck(name, description, assignment):
+        await asyncio.Event().wait()
+
+    async def submit():
+        set_agent_deadline(0.05)
+        manager.run_task(stuck, "stuck", "", assignment("a"))
+
+    await asyncio.create_task(submit())
+    while manager.running_tasks:
+        await asyncio.sleep(0.01)
+    assert roster_api.requests[0][0]["status"]["error"] == "Deadline exceeded"
+
+
+def test_non_finite_deadlines_are_ignored():
+    async def deadline(timeout):
+        set_agent_deadline(timeout)
+        return agent_deadline.get()
+
+    for timeout in (float("nan"), float("inf"), float("-inf"), 0, None):
+        assert asyncio.run(deadline(timeout)) is None
+    assert asyncio.run(deadline(1.0)) is not None
+
+
+@pytest.mark.asyncio
+async def test_subtasks_run_concurrently_and_report_failures(roster_api, client):
+    task_interface = TaskInterface("agent", client)
+    set_agent_activity_context("parent", ExecutionType.TASK)
+
+    results = await task_interface.gather_subtasks(
+        [("one", "first"), ("two", "fail"), ("three", "third")], concurrency=2
+    )
+    assert [result.value for result in results] == ["first done", None, "third done"]
+    assert isinstance(results[1].error, errors.SubtaskFailed)
+    assert roster_api.tasks["one"]["parent"]["description"] == "the parent task"
+
+    assert await task_interface.execute_subtask("four", "fourth") == "fourth done"
+    assert await task_interface.execute_subtask("five", "fail") == (
+        "Subtask five failed: Subtask five finished with status error: failed"
+    )
+    await task_interface.aclose()
+
+
+@pytest.mark.asyncio
+async def test_subtasks_are_polled_without_resource_events(roster_api, client):
+    roster_api.settings["events"] = False
+    task_interface = TaskInterface(
+        "agent", client, subtask_connect_timeout=0.05, subtask_poll_interval=0.05
+    )
+    set_agent_activity_context("parent", ExecutionType.TASK)
+
+    result = await asyncio.wait_for(task_interface.execute_subtask("one", "first"), 5)
+    assert result == "first done"
+    await task_interface.aclose()
+
+
+@pytest.mark.asyncio
+async def test_subtasks_run_on_worker_threads(roster_api, client):
+    task_interface = TaskInterface("agent", client)
+    set_agent_activity_context("parent", ExecutionType.TASK)
+    workers = ThreadWorkers(max_workers=2, client=client)
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                workers.run(task_interface.execute_subtask, "one", "first"),
+                workers.run(task_interface.execute_subtask, "two", "second"),
+            ),
+            timeout=5,
+        )
+    finally:
+        await workers.aclose()
+    assert results == ["first done", "second done"]
+
+
+class LegacyAgent:
+    """Implements ack_task as it was before tasks had priorities"""
+
+    def __init__(self):
+        self.acked = []
+
+    async def ack_task(self, name: str, description: str, assignment: TaskAssignment):
+        self.acked.append(name)
+
+
+@pytest.mark.asyncio
+async def test_entrypoint_supports_agents_without_task_priorities():
+    legacy = LegacyAgent()
+    entrypoint = Entrypoint(agent=legacy, config=AgentConfig())
+    args = {
+        "task": "task-1",
+        "description": "Do it",
+        "assignment": TaskAssignment.Config.schema_extra["example"],
+        "priority": 5,
+    }
+    body = json.dumps(args).encode("utf-8")
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/tasks",
+        "headers": [(b"content-type", b"application/json")],
+        "query_string": b"",
+        "client": ("client", 1234),
+        "server": ("agent", 80),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asyncio.create_task(entrypoint.app(scope, receive, send))
+    assert messages[0]["status"] == 200
+    assert legacy.acked == ["task-1"]